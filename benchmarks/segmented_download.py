@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Segmentli indirici ile yerel (tek bağlantı) indiricinin karsilastirmasi
+
+Bağlantı başina hiz sinirli, Range destekli yerel bir HTTP sunucusu
+baslatir ve ayni dosyayi once yt-dlp'nin yerel indiricisiyle (yüklü
+degilse tek bağlantılı urllib ile), sonra segmentli indiriciyle indirir.
+
+    python benchmarks/segmented_download.py --size 32 --rate 2 --connections 8
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from functions.segmented_downloader import SegmentedDownloader  # noqa: E402
+
+
+def make_handler(payload: bytes, rate: int):
+    """Bağlantı başina `rate` bayt/sn ile sinirli Range handler'i"""
+
+    class ThrottledHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            start, end = 0, len(payload) - 1
+            byte_range = self.headers.get("Range")
+            if byte_range and byte_range.startswith("bytes="):
+                first, _, last = byte_range[6:].partition("-")
+                start = int(first)
+                end = int(last) if last else end
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+            else:
+                self.send_response(200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+
+            # 50 ms'lik dilimlerle hiz siniri uygula
+            step = max(rate // 20, 1)
+            offset = start
+            while offset <= end:
+                began = time.monotonic()
+                chunk = payload[offset:min(offset + step, end + 1)]
+                self.wfile.write(chunk)
+                offset += len(chunk)
+                delay = len(chunk) / rate - (time.monotonic() - began)
+                if delay > 0:
+                    time.sleep(delay)
+
+    return ThrottledHandler
+
+
+def native_download(url: str, output: Path) -> str:
+    """yt-dlp yerel indiricisi, yoksa tek bağlantılı urllib"""
+    if shutil.which("yt-dlp"):
+        subprocess.run(
+            ["yt-dlp", "--quiet", "--no-part", "--force-generic-extractor", "-o", str(output), url],
+            check=True
+        )
+        return "yt-dlp (native)"
+    with urllib.request.urlopen(url) as response, open(output, "wb") as f:
+        shutil.copyfileobj(response, f, 256 * 1024)
+    return "urllib (tek baglanti)"
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=32, help="Dosya boyutu (MiB)")
+    parser.add_argument("--rate", type=float, default=2, help="Bağlantı başina hiz siniri (MiB/s)")
+    parser.add_argument("--connections", type=int, default=8, help="Segmentli indirici bağlantı sayisi")
+    args = parser.parse_args()
+
+    payload = os.urandom(args.size * 1024 * 1024)
+    digest = hashlib.sha256(payload).hexdigest()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(payload, int(args.rate * 1024 * 1024)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/payload.bin"
+
+    workdir = Path(tempfile.mkdtemp(prefix="nora-bench-"))
+    try:
+        native_out = workdir / "native.bin"
+        name = None
+
+        def run_native():
+            nonlocal name
+            name = native_download(url, native_out)
+
+        native_time = timed(run_native)
+
+        segmented_out = workdir / "segmented.bin"
+        segmented_time = timed(lambda: SegmentedDownloader(
+            url, segmented_out, connections=args.connections, quiet=True
+        ).run())
+
+        for path in (native_out, segmented_out):
+            if hashlib.sha256(path.read_bytes()).hexdigest() != digest:
+                raise SystemExit(f"Hatali icerik: {path.name}")
+
+        size_mib = args.size
+        print(f"Dosya: {size_mib} MiB, baglanti basina sinir: {args.rate} MiB/s")
+        print(f"{name:<28} {native_time:7.2f} s  {size_mib / native_time:7.2f} MiB/s")
+        print(f"{'segmented x' + str(args.connections):<28} {segmented_time:7.2f} s  {size_mib / segmented_time:7.2f} MiB/s")
+        print(f"Hizlanma: {native_time / segmented_time:.1f}x")
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Spotify boru hatti ile tek spotdl çalistirmasinin karsilastirmasi
+
+Spotify API'si, YouTube Music araması ve indirme sabit gecikmelerle taklit
+edilir. Tek çalistirma spotdl CLI'nin sirasini izler: önce tüm sayfalar
+çözülür, sonra 4 iş parçacigi her parça için eşleştirip indirir. Boru hatti
+ayni gecikmelerle SpotifyPipeline'i çalıştırır; eşleştirmeye parça başina
+ek metadata isteği de eklenir (Song.from_url).
+
+    python benchmarks/spotify_pipeline.py --tracks 400 --page 0.3 --search 0.05 --download 0.12
+"""
+
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from functions import spotify_pipeline  # noqa: E402
+from functions.spotify_pipeline import SpotifyPipeline  # noqa: E402
+
+PAGE_SIZE = 100
+
+
+def pages(args):
+    """Sayfa başina gecikmeyle parça URL'leri"""
+    for start in range(0, args.tracks, PAGE_SIZE):
+        time.sleep(args.page)
+        for index in range(start, min(start + PAGE_SIZE, args.tracks)):
+            yield f"track-{index}"
+
+
+def single_run(args) -> tuple:
+    """Tek spotdl: tüm liste çözülür, sonra 4 iş parçacigi eşleştirip indirir"""
+    started = time.monotonic()
+    first = None
+    lock = threading.Lock()
+
+    def search_and_download(track):
+        nonlocal first
+        time.sleep(args.search)
+        time.sleep(args.download)
+        with lock:
+            if first is None:
+                first = time.monotonic() - started
+
+    tracks = list(pages(args))
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(search_and_download, tracks))
+    return first, time.monotonic() - started
+
+
+def pipelined_run(args) -> tuple:
+    def match(track):
+        time.sleep(args.metadata)
+        time.sleep(args.search)
+        return track
+
+    def fetch(song):
+        time.sleep(args.download)
+        return song
+
+    pipeline = SpotifyPipeline(match, fetch, matchers=4, workers=4)
+    started = time.monotonic()
+    pipeline.run(pages(args))
+    if pipeline.completed != args.tracks:
+        raise SystemExit(f"Eksik parça: {pipeline.completed}/{args.tracks}")
+    return pipeline.first_file, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=400, help="Parça sayisi")
+    parser.add_argument("--page", type=float, default=0.3, help="Sayfa (100 parça) başina API gecikmesi (sn)")
+    parser.add_argument("--metadata", type=float, default=0.02, help="Parça başina metadata gecikmesi (sn)")
+    parser.add_argument("--search", type=float, default=0.05, help="Parça başina eşleştirme gecikmesi (sn)")
+    parser.add_argument("--download", type=float, default=0.12, help="Parça başina indirme süresi (sn)")
+    args = parser.parse_args()
+
+    spotify_pipeline.console.quiet = True
+    single_first, single_total = single_run(args)
+    pipe_first, pipe_total = pipelined_run(args)
+
+    print(f"Parca: {args.tracks}, sayfa: {args.page} sn, eslestirme: {args.search} sn, indirme: {args.download} sn")
+    print(f"{'':<24} {'ilk dosya':>10} {'toplam':>10}")
+    print(f"{'tek spotdl (4 thread)':<24} {single_first:9.2f}s {single_total:9.2f}s")
+    print(f"{'boru hatti (4+4)':<24} {pipe_first:9.2f}s {pipe_total:9.2f}s")
+    print(f"Ilk dosya: {single_first / pipe_first:.1f}x, toplam: {single_total / pipe_total:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
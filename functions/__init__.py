@@ -2,5 +2,6 @@
 from .spotify_downloader import SpotifyDownloader
 from .youtube_downloader import YouTubeDownloader
 from .ffmpeg_installer import FFmpegInstaller
+from .segmented_downloader import SegmentedDownloader
 
-__all__ = ['SpotifyDownloader', 'YouTubeDownloader', 'FFmpegInstaller']
+__all__ = ['SpotifyDownloader', 'YouTubeDownloader', 'FFmpegInstaller', 'SegmentedDownloader']
@@ -11,6 +11,8 @@ from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, DownloadColumn
 
+from .tracing import tracer
+
 console = Console()
 
 
@@ -24,16 +26,17 @@ class FFmpegInstaller:
     
     def check_ffmpeg(self) -> bool:
         """FFmpeg'in yüklü olup olmadığını kontrol et"""
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-version"],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        with tracer.span("ffmpeg.check", "ffmpeg"):
+            try:
+                result = subprocess.run(
+                    ["ffmpeg", "-version"],
+                    capture_output=True,
+                    text=True,
+                    check=False
+                )
+                return result.returncode == 0
+            except FileNotFoundError:
+                return False
     
     def install_ffmpeg_windows(self):
         """Windows için FFmpeg kur"""
@@ -169,15 +172,16 @@ class FFmpegInstaller:
             return True
         
         success = False
-        if self.system == "Windows":
-            success = self.install_ffmpeg_windows()
-        elif self.system == "Linux":
-            success = self.install_ffmpeg_linux()
-        elif self.system == "Darwin":
-            success = self.install_ffmpeg_mac()
-        else:
-            console.print(f"[red]✗ Desteklenmeyen platform: {self.system}[/red]\n")
-            return False
+        with tracer.span("ffmpeg.install", "ffmpeg", system=self.system):
+            if self.system == "Windows":
+                success = self.install_ffmpeg_windows()
+            elif self.system == "Linux":
+                success = self.install_ffmpeg_linux()
+            elif self.system == "Darwin":
+                success = self.install_ffmpeg_mac()
+            else:
+                console.print(f"[red]✗ Desteklenmeyen platform: {self.system}[/red]\n")
+                return False
         
         if success and self.check_ffmpeg():
             console.print("[green]✓ FFmpeg basariyla kuruldu ve test edildi![/green]\n")
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""Live Capture Module - canlı yayinlari sabit uzunlukta dönen parçalara kaydet
+
+yt-dlp yalnizca HLS manifest adresini bulmak için kullanilir; medya
+parçalari sıra numarasiyla (EXT-X-MEDIA-SEQUENCE) takip edilir. Bağlantı
+koptugunda manifest yeniden alinir ve son yazilan numaradan devam edilir,
+böylece hiçbir parça iki kez yazilmaz. Bellek ve disk kullanimi sınırlıdır:
+parçalar dosyaya akitilir, eski dosyalar saklama süresine göre silinir.
+"""
+
+import re
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+from rich.console import Console
+
+from .staging import ScratchStage
+from .tracing import tracer
+from .url_normalizer import parse_url
+
+console = Console()
+
+CHUNK_SIZE = 256 * 1024
+LIVE_EDGE_SEGMENTS = 3
+MAX_FETCH_FAILURES = 3
+MAX_PLAYLIST_SIZE = 4 * 1024 * 1024
+
+
+class NotLiveError(RuntimeError):
+    """Adres şu an canlı bir HLS yayini değil (bitmis yayin, video, ...)"""
+
+
+def is_live_url(url: str) -> bool:
+    """youtube.com/live/ID gibi canlı yayin adresi mi (yalnizca adrese bakar)
+
+    Bitmis yayinlar da /live/ID adresini korur; kesin karar için
+    LiveCapture.resolve yt-dlp'nin live_status alanina bakar.
+    """
+    return parse_url(url).kind == "live"
+
+
+def _is_manifest(data: bytes) -> bool:
+    return data.lstrip(b"\xef\xbb\xbf \t\r\n").startswith(b"#EXTM3U")
+
+
+def _live_latency(segment) -> float:
+    """Parçanin yayin zamanindan diske yazilana kadar geçen süre (biliniyorsa)"""
+    if not segment.program_date:
+        return None
+    try:
+        produced = datetime.fromisoformat(segment.program_date.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return round(time.time() - produced.timestamp() - segment.duration, 3)
+
+
+class HLSSegment:
+    """Medya playlist'indeki tek bir parça"""
+
+    __slots__ = ("sequence", "duration", "uri", "program_date")
+
+    def __init__(self, sequence: int, duration: float, uri: str, program_date: str = None):
+        self.sequence = sequence
+        self.duration = duration
+        self.uri = uri
+        self.program_date = program_date
+
+
+def parse_playlist(text: str, base_url: str) -> dict:
+    """HLS playlist'ini ayrıştır (master ise varyantlar, medya ise parçalar)"""
+    playlist = {"variants": [], "segments": [], "init": None, "ended": False, "target": 2.0}
+    sequence = 0
+    duration = None
+    program_date = None
+    bandwidth = None
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-STREAM-INF"):
+            match = re.search(r"BANDWIDTH=(\d+)", line)
+            bandwidth = int(match.group(1)) if match else 0
+        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-TARGETDURATION:"):
+            playlist["target"] = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-MAP:"):
+            match = re.search(r'URI="([^"]+)"', line)
+            if match:
+                playlist["init"] = urljoin(base_url, match.group(1))
+        elif line.startswith("#EXT-X-PROGRAM-DATE-TIME:"):
+            program_date = line.split(":", 1)[1]
+        elif line.startswith("#EXTINF:"):
+            duration = float(line.split(":", 1)[1].split(",")[0])
+        elif line.startswith("#EXT-X-ENDLIST"):
+            playlist["ended"] = True
+        elif not line.startswith("#"):
+            uri = urljoin(base_url, line)
+            if bandwidth is not None:
+                playlist["variants"].append((bandwidth, uri))
+                bandwidth = None
+            else:
+                playlist["segments"].append(HLSSegment(sequence, duration or 0.0, uri, program_date))
+                sequence += 1
+                duration = None
+                program_date = None
+    return playlist
+
+
+class LiveCapture:
+    """Canlı yayini dönen parçalara kaydet"""
+
+    def __init__(
+        self,
+        output_dir: str = "downloads",
+        segment_seconds: int = 300,
+        retention_seconds: int = None,
+        from_start: bool = False,
+        scratch_dir: str = None
+    ):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(exist_ok=True)
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self.from_start = from_start
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
+        self.session = requests.Session()
+
+        self.title = "live"
+        self._url = None
+        self.manifest_url = None
+        self.last_sequence = None
+        self.init_data = None
+        self.published = []
+        self._file = None
+        self._path = None
+        self._index = 0
+        self._seconds = 0.0
+        self._bytes = 0
+        self._fetch_time = 0.0
+        self._stage = None
+
+    def resolve(self, url: str):
+        """yt-dlp ile yayin durumunu, başlik ve HLS manifest adresini al"""
+        with tracer.span("live.resolve", "live", url=url):
+            result = subprocess.run(
+                [
+                    "yt-dlp",
+                    "--no-warnings",
+                    "--no-playlist",
+                    "-f", "best[protocol^=m3u8]/best",
+                    "--print", "live_status",
+                    "--print", "protocol",
+                    "--print", "title",
+                    "--print", "urls",
+                    url
+                ],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        lines = result.stdout.strip().splitlines()
+        if len(lines) < 4:
+            raise RuntimeError("Canli yayin adresi alinamadi")
+        live_status, protocol = lines[0], lines[1]
+        # Bitmis yayinlarda (post_live/was_live) yt-dlp progresif MP4 adresi döndürür
+        if live_status != "is_live" or "m3u8" not in protocol:
+            raise NotLiveError(f"Canli HLS yayini degil ({live_status}, {protocol})")
+        self.title = re.sub(r'[\\/:*?"<>|]+', "_", lines[2]).strip() or "live"
+        self.manifest_url = lines[3]
+
+    def _fetch_playlist(self) -> dict:
+        """Medya playlist'ini al (master ise en yüksek bant genişliğini seç)"""
+        url = self.manifest_url
+        for _ in range(3):
+            with self.session.get(url, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                # Manifest yerine medya dosyasi dönerse belleğe çekmeden dur
+                data = b""
+                for chunk in response.iter_content(64 * 1024):
+                    data += chunk
+                    if len(data) >= 64 and not _is_manifest(data):
+                        break
+                    if len(data) > MAX_PLAYLIST_SIZE:
+                        raise NotLiveError("HLS manifest'i beklenenden buyuk")
+                if not _is_manifest(data):
+                    raise NotLiveError("Adres bir HLS manifest'i degil")
+                text = data.decode(response.encoding or "utf-8", errors="replace")
+            playlist = parse_playlist(text, response.url)
+            if not playlist["variants"]:
+                self.manifest_url = url
+                return playlist
+            url = max(playlist["variants"])[1]
+        raise RuntimeError("Medya playlist'i bulunamadi")
+
+    @property
+    def _extension(self) -> str:
+        return "mp4" if self.init_data is not None else "ts"
+
+    def _open_segment(self):
+        # Ayni başlikli önceki kayitlarin dosyalarinin üzerine yazma
+        while True:
+            self._index += 1
+            name = f"{self.title} - {self._index:05d}.{self._extension}"
+            if not (self.output_dir / name).exists():
+                break
+        self._path = self._stage.path / name
+        self._file = open(self._path, "wb")
+        if self.init_data is not None:
+            self._file.write(self.init_data)
+        self._seconds = 0.0
+        self._bytes = 0
+        self._fetch_time = 0.0
+
+    def _close_segment(self):
+        """Dönen dosyayi kapat, yayinla ve saklama süresini uygula"""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        if self._seconds == 0:
+            self._path.unlink()
+            return
+
+        target = self._stage.publish(self._path)
+        self.published.append(target)
+        throughput = self._bytes / self._fetch_time if self._fetch_time else 0
+        tracer.record({
+            "job": "live.file",
+            "file": target.name,
+            "seconds": round(self._seconds, 3),
+            "bytes": self._bytes,
+            "throughput_Bps": int(throughput),
+        })
+        console.print(
+            f"[green]✓[/green] {target.name} [dim]{self._seconds:.0f} sn, "
+            f"{self._bytes / (1024 * 1024):.1f} MB, {throughput / (1024 * 1024):.2f} MB/s[/dim]"
+        )
+
+        if self.retention_seconds:
+            keep = max(1, -(-self.retention_seconds // self.segment_seconds))
+            while len(self.published) > keep:
+                old = self.published.pop(0)
+                if old.exists():
+                    old.unlink()
+
+    def _write_segment(self, segment: HLSSegment):
+        """Parçayi akitarak yaz; hata olursa dosyayi parça başina geri sar"""
+        if self._file is None or self._seconds >= self.segment_seconds:
+            self._close_segment()
+            self._open_segment()
+
+        position = self._file.tell()
+        for attempt in range(3):
+            started = time.monotonic()
+            first_byte = None
+            written = 0
+            try:
+                with self.session.get(segment.uri, stream=True, timeout=10) as response:
+                    response.raise_for_status()
+                    for data in response.iter_content(CHUNK_SIZE):
+                        if first_byte is None:
+                            first_byte = time.monotonic() - started
+                        self._file.write(data)
+                        written += len(data)
+                break
+            except requests.RequestException:
+                self._file.seek(position)
+                self._file.truncate()
+                if attempt == 2:
+                    raise
+        elapsed = time.monotonic() - started
+
+        self._seconds += segment.duration
+        self._bytes += written
+        self._fetch_time += elapsed
+        tracer.record({
+            "job": "live.segment",
+            "sequence": segment.sequence,
+            "bytes": written,
+            "duration_s": segment.duration,
+            "fetch_s": round(elapsed, 3),
+            "ttfb_s": round(first_byte, 3) if first_byte is not None else None,
+            "latency_s": _live_latency(segment),
+            "throughput_Bps": int(written / elapsed) if elapsed else None,
+        })
+
+    def _capture(self):
+        failures = 0
+        while True:
+            try:
+                playlist = self._fetch_playlist()
+                if playlist["init"] and self.init_data is None:
+                    response = self.session.get(playlist["init"], timeout=10)
+                    response.raise_for_status()
+                    self.init_data = response.content
+                failures = 0
+            except NotLiveError:
+                raise
+            except (requests.RequestException, RuntimeError, ValueError) as e:
+                failures += 1
+                console.print(f"[yellow]Baglanti koptu ({str(e)[:50]}), yeniden baglaniliyor...[/yellow]")
+                if failures >= MAX_FETCH_FAILURES:
+                    # Manifest adresinin süresi dolmus olabilir
+                    try:
+                        self.resolve(self._url)
+                        failures = 0
+                    except NotLiveError:
+                        console.print("[cyan]Yayin sona erdi.[/cyan]")
+                        return
+                    except (subprocess.CalledProcessError, RuntimeError):
+                        pass
+                time.sleep(min(0.5 * failures, 2))
+                continue
+
+            segments = playlist["segments"]
+            if self.last_sequence is None:
+                segments = segments if self.from_start else segments[-LIVE_EDGE_SEGMENTS:]
+            elif segments and segments[-1].sequence < self.last_sequence:
+                # Yayin yeniden baslamis, numaralandirma sifirlandi
+                console.print("[yellow]Yayin yeniden basladi[/yellow]")
+            else:
+                segments = [s for s in segments if s.sequence > self.last_sequence]
+
+            for segment in segments:
+                try:
+                    self._write_segment(segment)
+                except requests.RequestException as e:
+                    console.print(f"[yellow]Parca {segment.sequence} atlandi: {str(e)[:50]}[/yellow]")
+                self.last_sequence = segment.sequence
+
+            if playlist["ended"]:
+                console.print("[cyan]Yayin sona erdi.[/cyan]")
+                return
+            # Yeni parça için hedef sürenin yarisi kadar bekle
+            time.sleep(max(playlist["target"] / 2, 0.5))
+
+    def record(self, url: str):
+        """Yayini Ctrl+C veya yayin bitene kadar kaydet"""
+        self._url = url
+        self.resolve(url)
+        console.print(f"[bold green]→[/bold green] Canli yayin kaydi: [white]{self.title}[/white]")
+        console.print(
+            f"[dim]{self.segment_seconds} sn'lik parcalar"
+            + (f", son {self.retention_seconds} sn saklanir" if self.retention_seconds else "")
+            + (", yayinin basindan" if self.from_start else ", canli noktadan")
+            + " - durdurmak icin Ctrl+C[/dim]\n"
+        )
+
+        with ScratchStage(self.output_dir, self.scratch_dir) as self._stage:
+            try:
+                with tracer.span("live.capture", "live", url=url):
+                    self._capture()
+            except KeyboardInterrupt:
+                console.print("\n[yellow]Kayit durduruldu.[/yellow]")
+            finally:
+                self._close_segment()
+        console.print(f"[cyan]Konum: {self.output_dir}[/cyan]")
@@ -0,0 +1,431 @@
+# -*- coding: utf-8 -*-
+"""Segmented Downloader - asyncio tabanli çok bağlantılı HTTP indirici
+
+Dosyayi byte araliklarina böler, birkac keep-alive bağlantı üzerinden
+indirir ve önceden ayrilmis dosyada doğru ofsetlere yazar. Basarisiz
+parçalar kaldigi yerden tekrar denenir.
+
+yt-dlp'ye curl uyumlu harici indirici olarak takilir; bu yuzden modul
+yalnizca standart kutuphaneyi kullanir ve tek basina calistirilabilir.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import ssl
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+CHUNK_SIZE = 256 * 1024
+MIN_SEGMENT_SIZE = 1024 * 1024
+MAX_REDIRECTS = 10
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+SHIM_DIR = Path.home() / ".noradownloader" / "bin"
+
+
+class SegmentedDownloadError(Exception):
+    """Segmentli indirme basarisiz oldu"""
+
+
+class _Response:
+    """Durum satiri ve basliklari okunmus HTTP yaniti"""
+
+    def __init__(self, status: int, headers: dict):
+        self.status = status
+        self.headers = headers
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+class _Connection:
+    """Tek bir keep-alive HTTP/1.1 bağlantısı"""
+
+    def __init__(self, url: str, headers: dict, timeout: float, insecure: bool = False):
+        self.url = url
+        self.headers = headers
+        self.timeout = timeout
+        self.insecure = insecure
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        parts = urlsplit(self.url)
+        context = None
+        if parts.scheme == "https":
+            context = ssl.create_default_context()
+            if self.insecure:
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(parts.hostname, port, ssl=context),
+            self.timeout
+        )
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, start: int, end: int = None) -> _Response:
+        """Range istegi gonder ve yanit basliklarini oku"""
+        if self.writer is None:
+            await self.open()
+
+        parts = urlsplit(self.url)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        byte_range = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+
+        lines = [
+            f"GET {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            f"Range: {byte_range}",
+            "Accept-Encoding: identity",
+            "Connection: keep-alive",
+        ]
+        for key, value in self.headers.items():
+            if key.lower() not in ("host", "range", "accept-encoding", "connection"):
+                lines.append(f"{key}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await self.writer.drain()
+
+        status_line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        if not status_line:
+            raise ConnectionError("Sunucu bağlantıyı kapatti")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        return _Response(status, headers)
+
+    async def iter_body(self, response: _Response):
+        """Yanit govdesini parça parça oku"""
+        if response.headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+                size = int(size_line.split(b";")[0], 16)
+                if size == 0:
+                    await asyncio.wait_for(self.reader.readline(), self.timeout)
+                    return
+                remaining = size
+                while remaining:
+                    data = await asyncio.wait_for(self.reader.read(min(remaining, CHUNK_SIZE)), self.timeout)
+                    if not data:
+                        raise ConnectionError("Parça yarida kesildi")
+                    remaining -= len(data)
+                    yield data
+                await asyncio.wait_for(self.reader.readline(), self.timeout)
+
+        length = response.headers.get("content-length")
+        if length is None:
+            # Uzunluk yoksa bağlantı kapanana kadar oku
+            while True:
+                data = await asyncio.wait_for(self.reader.read(CHUNK_SIZE), self.timeout)
+                if not data:
+                    self.close()
+                    return
+                yield data
+
+        remaining = int(length)
+        while remaining:
+            data = await asyncio.wait_for(self.reader.read(min(remaining, CHUNK_SIZE)), self.timeout)
+            if not data:
+                raise ConnectionError("Parça yarida kesildi")
+            remaining -= len(data)
+            yield data
+
+
+class SegmentedDownloader:
+    """Byte araliklarini paralel keep-alive bağlantılarla indir"""
+
+    def __init__(
+        self,
+        url: str,
+        output: str,
+        connections: int = 8,
+        headers: dict = None,
+        retries: int = 5,
+        timeout: float = 30,
+        resume: bool = True,
+        insecure: bool = False,
+        quiet: bool = False
+    ):
+        self.url = url
+        self.output = Path(output)
+        self.state_path = self.output.with_name(self.output.name + ".segments")
+        self.connections = max(1, connections)
+        self.headers = dict(headers or {})
+        self.retries = retries
+        self.timeout = timeout
+        self.resume = resume
+        self.insecure = insecure
+        self.quiet = quiet
+        self.total = None
+        self.downloaded = 0
+        self._done = []
+        self._file = None
+
+    def run(self) -> int:
+        """İndirmeyi çalıştır, yazilan toplam bayti döndür"""
+        return asyncio.run(self.download())
+
+    def _connection(self) -> _Connection:
+        return _Connection(self.url, self.headers, self.timeout, self.insecure)
+
+    async def _probe(self) -> bool:
+        """Yönlendirmeleri izle, boyutu ve Range destegini ogren"""
+        for _ in range(MAX_REDIRECTS):
+            conn = self._connection()
+            try:
+                response = await conn.request(0, 0)
+                if response.status in REDIRECT_CODES:
+                    self.url = urljoin(self.url, response.headers["location"])
+                    continue
+                if response.status == 206:
+                    content_range = response.headers.get("content-range", "")
+                    total = content_range.rpartition("/")[2]
+                    if total.isdigit():
+                        self.total = int(total)
+                        return True
+                if response.status >= 400:
+                    raise SegmentedDownloadError(f"HTTP {response.status}: {self.url}")
+                return False
+            finally:
+                conn.close()
+        raise SegmentedDownloadError("Cok fazla yonlendirme")
+
+    def _plan(self) -> list:
+        """Toplam boyutu parçalara böl, daha once bitenleri atla"""
+        size = max(MIN_SEGMENT_SIZE, -(-self.total // (self.connections * 4)))
+        done = set()
+        if self.resume and self.state_path.exists() and self.output.exists():
+            try:
+                state = json.loads(self.state_path.read_text(encoding="utf-8"))
+                if state.get("total") == self.total and state.get("segment_size") == size:
+                    done = {tuple(r) for r in state.get("done", [])}
+            except (OSError, ValueError):
+                pass
+
+        segments = []
+        for start in range(0, self.total, size):
+            end = min(start + size, self.total) - 1
+            if (start, end) in done:
+                self._done.append((start, end))
+                self.downloaded += end - start + 1
+            else:
+                segments.append((start, end))
+        self._segment_size = size
+        return segments
+
+    def _save_state(self):
+        # Bitti olarak kaydedilen aralik diskte olmali; yoksa devam ederken
+        # sifirlarla dolu bir aralik tamam sanilir
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        state = {"total": self.total, "segment_size": self._segment_size, "done": self._done}
+        self.state_path.write_text(json.dumps(state), encoding="utf-8")
+
+    def _preallocate(self):
+        """Dosyayi hedef boyutta önceden ayir (ilk veri geldiginde)
+
+        Dosya ilk bayt gelmeden büyütülürse, dizini izleyen TTFB ölçümü
+        veri gelmeden tetiklenir.
+        """
+        mode = "r+b" if self.output.exists() and self._done else "wb"
+        self._file = open(self.output, mode)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(self._file.fileno(), 0, self.total)
+                return
+            except OSError:
+                pass
+        self._file.truncate(self.total)
+
+    def _write(self, offset: int, data: bytes):
+        if self._file is None:
+            self._preallocate()
+        self._file.seek(offset)
+        self._file.write(data)
+
+    async def _worker(self, queue: asyncio.Queue):
+        conn = self._connection()
+        try:
+            while True:
+                try:
+                    original, start, end, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                written = 0
+                try:
+                    response = await conn.request(start, end)
+                    if response.status != 206:
+                        raise ConnectionError(f"Beklenmeyen yanit: HTTP {response.status}")
+                    async for data in conn.iter_body(response):
+                        self._write(start + written, data)
+                        written += len(data)
+                        self.downloaded += len(data)
+                    if written != end - start + 1:
+                        raise ConnectionError("Eksik parça")
+                    if not response.keep_alive:
+                        conn.close()
+                    self._done.append(original)
+                    self._save_state()
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError) as e:
+                    # Kalan kismi yeni bir bağlantıyla tekrar dene
+                    conn.close()
+                    if attempt >= self.retries:
+                        raise SegmentedDownloadError(f"Parça {start}-{end} indirilemedi: {e}") from e
+                    await asyncio.sleep(min(2 ** attempt * 0.25, 5))
+                    queue.put_nowait((original, start + written, end, attempt + 1))
+        finally:
+            conn.close()
+
+    async def _report(self):
+        started = time.monotonic()
+        while True:
+            await asyncio.sleep(0.5)
+            elapsed = max(time.monotonic() - started, 1e-6)
+            percent = self.downloaded * 100 / self.total if self.total else 0
+            speed = self.downloaded / elapsed / (1024 * 1024)
+            sys.stderr.write(f"\r[segmented] {percent:5.1f}% {speed:6.2f} MiB/s x{self.connections}")
+            sys.stderr.flush()
+
+    async def _single(self):
+        """Range desteklenmiyorsa tek bağlantıyla indir"""
+        for _ in range(MAX_REDIRECTS):
+            conn = self._connection()
+            try:
+                response = await conn.request(0)
+                if response.status in REDIRECT_CODES:
+                    self.url = urljoin(self.url, response.headers["location"])
+                    continue
+                if response.status >= 400:
+                    raise SegmentedDownloadError(f"HTTP {response.status}: {self.url}")
+                with open(self.output, "wb") as f:
+                    async for data in conn.iter_body(response):
+                        f.write(data)
+                        self.downloaded += len(data)
+                return
+            finally:
+                conn.close()
+        raise SegmentedDownloadError("Cok fazla yonlendirme")
+
+    async def download(self) -> int:
+        if not await self._probe():
+            await self._single()
+            return self.downloaded
+
+        queue = asyncio.Queue()
+        for start, end in self._plan():
+            queue.put_nowait(((start, end), start, end, 0))
+
+        reporter = None if self.quiet else asyncio.ensure_future(self._report())
+        try:
+            workers = [self._worker(queue) for _ in range(min(self.connections, queue.qsize()))]
+            await asyncio.gather(*workers)
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+                sys.stderr.write("\n")
+            if self._file is not None:
+                self._file.close()
+
+        if self.state_path.exists():
+            self.state_path.unlink()
+        return self.downloaded
+
+
+def install_shim() -> Path:
+    """yt-dlp için curl uyumlu başlatıcı oluştur ve yolunu döndür"""
+    SHIM_DIR.mkdir(parents=True, exist_ok=True)
+    script = Path(__file__).resolve()
+    if sys.platform == "win32":
+        shim = SHIM_DIR / "curl.cmd"
+        content = f'@"{sys.executable}" "{script}" %*\r\n'
+    else:
+        shim = SHIM_DIR / "curl"
+        content = f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n'
+    if not shim.exists() or shim.read_text() != content:
+        shim.write_text(content)
+        shim.chmod(0o755)
+    return shim
+
+
+def ytdlp_args(connections: int) -> list:
+    """yt-dlp'nin HTTP indirmelerini segmentli indiriciye yönlendiren argumanlar"""
+    return [
+        "--downloader", f"http:{install_shim()}",
+        "--downloader-args", f"curl:--connections {connections}",
+    ]
+
+
+def main(argv=None) -> int:
+    """curl uyumlu komut satiri (yt-dlp'nin CurlFD argumanlari)"""
+    parser = argparse.ArgumentParser(prog="curl", add_help=False)
+    parser.add_argument("url", nargs="?")
+    parser.add_argument("-o", "--output")
+    parser.add_argument("-H", "--header", action="append", default=[])
+    parser.add_argument("--cookie")
+    parser.add_argument("-C", "--continue-at")
+    parser.add_argument("--retry", type=int, default=5)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--connect-timeout", type=float, default=30)
+    # yt-dlp'nin gonderdigi ama burada kullanilmayan degerli secenekler
+    for option in ("--limit-rate", "--max-filesize", "--interface", "--proxy"):
+        parser.add_argument(option)
+    parser.add_argument("-s", "--silent", action="store_true")
+    parser.add_argument("-k", "--insecure", action="store_true")
+    parser.add_argument("-V", "--version", action="store_true")
+    args, unknown = parser.parse_known_args(argv)
+
+    if args.version:
+        print("curl 8.0.0 (NoraDownloader segmented downloader)")
+        return 0
+    if not args.url or not args.output:
+        print("kullanim: curl -o FILE [--connections N] -- URL", file=sys.stderr)
+        return 2
+
+    if args.proxy:
+        print("[segmented] Uyari: proxy desteklenmiyor, dogrudan baglaniliyor", file=sys.stderr)
+
+    headers = {}
+    for header in args.header:
+        key, _, value = header.partition(":")
+        headers[key.strip()] = value.strip()
+    if args.cookie:
+        headers["Cookie"] = args.cookie
+
+    downloader = SegmentedDownloader(
+        args.url,
+        args.output,
+        connections=args.connections,
+        headers=headers,
+        retries=args.retry,
+        timeout=args.connect_timeout,
+        resume=args.continue_at == "-",
+        insecure=args.insecure,
+        quiet=args.silent
+    )
+    try:
+        downloader.run()
+    except (SegmentedDownloadError, OSError) as e:
+        print(f"\n[segmented] Hata: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
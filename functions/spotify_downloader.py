@@ -9,43 +9,58 @@ from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich import box
 
+from .spotify_pipeline import SpotifyPipeline, resolve_tracks, spotdl_stages
+from .staging import ScratchStage
+from .tracing import tracer
+from .transcoder import fan_out, fan_out_all
+from .url_normalizer import parse_url
+
 console = Console()
 
+# Çoklu formatta kaynak: YouTube'un opus akisi, yeniden kodlamadan
+SOURCE_FORMAT = "opus"
+
+# Parça listesi önceden çözülüp boru hattiyla indirilen türler
+PIPELINE_KINDS = ("playlist", "album", "artist")
+
 
 class SpotifyDownloader:
     """Spotify downloader wrapper"""
     
-    def __init__(self, output_dir: str = "downloads"):
+    def __init__(self, output_dir: str = "downloads", scratch_dir: str = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
     
     def check_spotdl(self) -> bool:
         """Check if spotdl is installed"""
-        try:
-            result = subprocess.run(
-                ["spotdl", "--version"],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        with tracer.span("spotdl.check", "spotify"):
+            try:
+                result = subprocess.run(
+                    ["spotdl", "--version"],
+                    capture_output=True,
+                    text=True,
+                    check=False
+                )
+                return result.returncode == 0
+            except FileNotFoundError:
+                return False
     
     def install_spotdl(self):
         """Install spotdl"""
         console.print("\n[yellow]spotdl bulunamadi. Yukleniyor...[/yellow]")
-        try:
-            subprocess.run(
-                [sys.executable, "-m", "pip", "install", "spotdl"],
-                check=True,
-                capture_output=True
-            )
-            console.print("[green]OK[/green] spotdl basariyla yuklendi!\n")
-            return True
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]X[/red] spotdl yuklenemedi: {e}\n")
-            return False
+        with tracer.span("spotdl.install", "spotify"):
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "spotdl"],
+                    check=True,
+                    capture_output=True
+                )
+                console.print("[green]OK[/green] spotdl basariyla yuklendi!\n")
+                return True
+            except subprocess.CalledProcessError as e:
+                console.print(f"[red]X[/red] spotdl yuklenemedi: {e}\n")
+                return False
     
     def interactive_mode_with_url(self, url: str):
         """Interactive mode with pre-provided URL"""
@@ -101,26 +116,94 @@ class SpotifyDownloader:
         console.print()
         self.download(url, bitrate, format_type)
     
-    def download(self, url: str, bitrate: str = "320k", format: str = "mp3"):
+    def download(self, url: str, bitrate: str = "320k", format: str = "mp3", pipeline: bool = True, formats: list = None):
         """Download from Spotify with optimizations"""
-        cmd = [
-            "spotdl",
-            "download",
-            url,
-            "--output", str(self.output_dir),
+        # Yarim dosyalar ve ara dönüşümler scratch dizininde (varsa) tutulur
+        stage = ScratchStage(self.output_dir, self.scratch_dir)
+        if formats:
+            # Kaynak bir kez indirilir, formatlar tek ffmpeg çağrisiyla üretilir
+            format, bitrate = SOURCE_FORMAT, "disable"
+        options = [
             "--format", format,
             "--bitrate", bitrate,
-            "--threads", "4",  # 4 paralel indirme
             "--cookie-file", "",  # Cookie kullanma (daha hızlı)
         ]
+        ref = parse_url(url)
+        url = ref.url
+        pipelined = pipeline and ref.kind in PIPELINE_KINDS
         
         console.print(f"[bold green]→[/bold green] Hizli indirme baslatiliyor (4 paralel)...\n")
         
+        # Hatalar stage tamamlandiktan sonra raporlanir; biten parçalar taşinmis olur
+        failed = []
+        returncode = 0
         try:
-            subprocess.run(cmd, check=True)
-            console.print(f"\n[bold green]OK Indirme tamamlandi![/bold green]")
-            console.print(f"[cyan]Konum: {self.output_dir}[/cyan]")
-        except subprocess.CalledProcessError as e:
-            console.print(f"\n[bold red]X Indirme sirasinda hata olustu![/bold red]")
+            with stage:
+                existing = set(stage.path.glob(f"*.{SOURCE_FORMAT}"))
+                with tracer.job("spotify.download", "spotify", [stage.path, self.output_dir], url=url, format=format, bitrate=bitrate) as job:
+                    result = self._download_pipelined(url, stage, format, bitrate, formats, job) if pipelined else None
+                    if result is None:
+                        # Tek spotdl scratch'e yazar; finalize var olan hedeflerin üzerine yazmaz
+                        cmd = ["spotdl", "download", url] + options + ["--output", str(stage.path), "--threads", "4"]  # 4 paralel indirme
+                        returncode = subprocess.run(cmd).returncode
+                        job.set(returncode=returncode)
+                    else:
+                        # Parçalar bittikçe yayinlandi; scratch'te kalanlar yarim
+                        stage.finalize_on_exit = False
+                        failed = result.failed
+                if formats and result is None:
+                    sources = sorted(set(stage.path.glob(f"*.{SOURCE_FORMAT}")) - existing)
+                    console.print(f"[bold green]→[/bold green] {len(sources)} dosya {len(formats)} formata donusturuluyor...")
+                    fan_out_all(sources, formats)
         except KeyboardInterrupt:
             console.print("\n[yellow]Indirme iptal edildi.[/yellow]")
+            return
+        
+        if failed:
+            console.print(f"\n[bold red]X {len(failed)} parca indirilemedi:[/bold red]")
+            for track, reason in failed[:10]:
+                console.print(f"  [dim]{track} ({reason})[/dim]")
+            if len(failed) > 10:
+                console.print(f"  [dim]... ve {len(failed) - 10} parca daha[/dim]")
+        elif returncode != 0:
+            console.print(f"\n[bold red]X Indirme sirasinda hata olustu![/bold red]")
+            console.print(f"[dim]Tamamlanan dosyalar kaydedildi.[/dim]")
+        else:
+            console.print(f"\n[bold green]OK Indirme tamamlandi![/bold green]")
+        console.print(f"[cyan]Konum: {self.output_dir}[/cyan]")
+    
+    def _download_pipelined(self, url: str, stage: ScratchStage, format: str, bitrate: str, formats: list, job):
+        """Parçalar çözülüp eşleştikçe indir; spotdl API'si yoksa None"""
+        extensions = [name for name, _ in formats] if formats else [format]
+        try:
+            # Çıktı dizininde zaten olan parçalar aranmadan atlanir
+            match, fetch = spotdl_stages(str(stage.path), format, bitrate, self.output_dir, extensions)
+        except Exception as e:
+            # spotdl yalnizca komut olarak kuruluysa (pipx) veya istemci açilamadiysa
+            console.print(f"[dim]spotdl API kullanilamadi ({str(e)[:60]}), tek spotdl ile devam ediliyor[/dim]")
+            return None
+        
+        def finish(song):
+            # Biten parça (gerekirse formatlara dönüştürülüp) hemen çıktı dizinine taşınir
+            path = fetch(song)
+            if path is None:
+                return None
+            outputs = fan_out(Path(path), formats) if formats else [Path(path)]
+            return [stage.publish(output) for output in outputs]
+        
+        # 4 eşleştirici + 4 indirici, tek Downloader örneği
+        pipeline = SpotifyPipeline(match, finish, matchers=4, workers=4)
+        try:
+            pipeline.run(resolve_tracks(url))
+        except Exception as e:
+            console.print(f"[dim]Parça listesi alinamadi ({str(e)[:60]}), tek spotdl ile devam ediliyor[/dim]")
+            return None
+        
+        job.set(tracks=pipeline.resolved, skipped=pipeline.skipped, failed=len(pipeline.failed), first_file_s=pipeline.first_file)
+        if pipeline.skipped:
+            console.print(f"[dim]{pipeline.skipped} parca zaten vardi, atlandi[/dim]")
+        if pipeline.first_file is not None:
+            console.print(f"[dim]Ilk dosya: {pipeline.first_file:.1f} sn[/dim]")
+        if pipeline.error is not None:
+            console.print(f"[yellow]Parça listesi eksik olabilir: {str(pipeline.error)[:60]}[/yellow]")
+        return pipeline
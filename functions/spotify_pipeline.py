@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Spotify Pipeline - parça çözümleme ve eşleştirmeyi indirmeyle üst üste bindir
+
+Çözümleyici playlist/albüm/sanatçi sayfalarini okudukca parçalari kuyruğa
+yazar; eşleştiriciler her parçanin metadata'sini ve YouTube Music eşini bulup
+sınırlı indirme kuyruğuna koyar; uzun ömürlü indiriciler ilk eşleşme gelir
+gelmez indirmeye başlar. Tüm işçiler tek bir spotdl Downloader'ı paylasir,
+böylece parça grubu başina yeni spotdl süreci açilmaz.
+"""
+
+import queue
+import threading
+import time
+from pathlib import Path
+
+from rich.console import Console
+
+from .tracing import tracer
+from .url_normalizer import parse_url
+
+console = Console()
+
+_DONE = object()
+
+
+def _client():
+    """spotdl'in Spotify istemcisini (gerekirse varsayilan kimlikle) hazirla"""
+    from spotdl.utils.config import DEFAULT_CONFIG
+    from spotdl.utils.spotify import SpotifyClient, SpotifyError
+
+    try:
+        return SpotifyClient()
+    except SpotifyError:
+        return SpotifyClient.init(
+            client_id=DEFAULT_CONFIG["client_id"],
+            client_secret=DEFAULT_CONFIG["client_secret"],
+            user_auth=False
+        )
+
+
+def _pages(client, page):
+    while page:
+        yield from page["items"]
+        page = client.next(page) if page.get("next") else None
+
+
+def resolve_tracks(url: str):
+    """Parça URL'lerini sayfa sayfa üret (tamamini beklemeden, tekrarsiz)"""
+    ref = parse_url(url)
+    if ref.kind not in ("playlist", "album", "artist"):
+        yield ref.url
+        return
+
+    client = _client()
+    if ref.kind == "playlist":
+        tracks = (
+            item.get("track")
+            for item in _pages(client, client.playlist_items(ref.id, additional_types=("track",)))
+        )
+    elif ref.kind == "album":
+        tracks = _pages(client, client.album_tracks(ref.id))
+    else:
+        tracks = (
+            track
+            for album in _pages(client, client.artist_albums(ref.id, album_type="album,single"))
+            for track in _pages(client, client.album_tracks(album["id"]))
+        )
+
+    # Ayni parça listede birden fazla kez geçebilir; kuyruga bir kez girer
+    seen = set()
+    for track in tracks:
+        if track and track.get("id") and track["id"] not in seen:
+            seen.add(track["id"])
+            yield f"https://open.spotify.com/track/{track['id']}"
+
+
+def spotdl_stages(output: str, format: str, bitrate: str, existing_dir: Path = None, extensions: list = None) -> tuple:
+    """spotdl Python API'si ile (eşleştir, indir) fonksiyonlari
+
+    existing_dir verilirse hedef dosyalarin hepsi (extensions, varsayilan
+    format) orada zaten varsa parça aranmadan atlanir; match None döner.
+    """
+    from spotdl.download.downloader import Downloader
+    from spotdl.types.song import Song
+    from spotdl.utils.formatter import create_file_name
+
+    _client()
+    downloader = Downloader({
+        "output": output,
+        "format": format,
+        "bitrate": bitrate,
+        "cookie_file": None,  # Cookie kullanma (daha hızlı)
+        "simple_tui": True,  # Paralel işçilerde rich ilerleme çubugu yerine satir çıktısı
+        "print_errors": False,
+    })
+
+    def exists(song) -> bool:
+        name = create_file_name(
+            song,
+            downloader.settings["output"],
+            format,
+            restrict=downloader.settings["restrict"],
+            file_name_length=downloader.settings["max_filename_length"],
+        ).name
+        return all(
+            (existing_dir / Path(name).with_suffix(f".{ext}").name).exists()
+            for ext in extensions or [format]
+        )
+
+    def match(track_url: str):
+        song = Song.from_url(track_url)
+        if existing_dir is not None and exists(song):
+            return None
+        song.download_url = downloader.search(song)
+        return song
+
+    def fetch(song):
+        _, path = downloader.search_and_download(song)
+        return path
+
+    return match, fetch
+
+
+class SpotifyPipeline:
+    """Çözümleme -> eşleştirme -> indirme; aşamalar arasinda sınırlı kuyruklar"""
+
+    def __init__(self, match, fetch, matchers: int = 4, workers: int = 4, queue_size: int = 64):
+        self.match = match
+        self.fetch = fetch
+        self.matchers = matchers
+        self.workers = workers
+        self.tracks = queue.Queue(maxsize=queue_size)
+        self.matched = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.resolved = 0
+        self.completed = 0
+        self.skipped = 0
+        self.failed = []
+        self.first_file = None
+        self.error = None
+        self._matchers_left = matchers
+        self._lock = threading.Lock()
+
+    def _fail(self, track: str, reason):
+        with self._lock:
+            self.failed.append((track, str(reason)[:80]))
+
+    def _resolver(self, tracks):
+        try:
+            with tracer.span("spotify.resolve", "spotify"):
+                for track in tracks:
+                    if self.stop.is_set():
+                        break
+                    self.tracks.put(track)
+                    self.resolved += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            for _ in range(self.matchers):
+                self.tracks.put(_DONE)
+
+    def _matcher(self):
+        try:
+            while not self.stop.is_set():
+                track = self.tracks.get()
+                if track is _DONE:
+                    return
+                try:
+                    with tracer.span("spotify.match", "spotify", track=track):
+                        song = self.match(track)
+                except Exception as e:
+                    self._fail(track, e)
+                    continue
+                if song is None:
+                    # Hedef dosyalar çıktı dizininde zaten var
+                    with self._lock:
+                        self.skipped += 1
+                    continue
+                self.matched.put((track, song))
+        finally:
+            with self._lock:
+                self._matchers_left -= 1
+                last = self._matchers_left == 0
+            if last:
+                for _ in range(self.workers):
+                    self.matched.put(_DONE)
+
+    def _worker(self, started: float):
+        while not self.stop.is_set():
+            item = self.matched.get()
+            if item is _DONE:
+                return
+            track, song = item
+            try:
+                with tracer.span("spotify.download", "spotify", track=track):
+                    path = self.fetch(song)
+            except Exception as e:
+                path, reason = None, e
+            else:
+                reason = "indirilemedi"
+
+            if path is None:
+                self._fail(track, reason)
+                continue
+            with self._lock:
+                self.completed += 1
+                if self.first_file is None:
+                    self.first_file = time.monotonic() - started
+                console.print(
+                    f"[green]✓[/green] {self.completed} tamamlandi"
+                    f" [dim]/ {self.resolved} cozuldu[/dim]"
+                )
+
+    def run(self, tracks):
+        """Çözümleyiciyi, eşleştiricileri ve indirici havuzunu çalıştır"""
+        started = time.monotonic()
+        threads = [threading.Thread(target=self._resolver, args=(tracks,), daemon=True)]
+        threads += [threading.Thread(target=self._matcher, daemon=True) for _ in range(self.matchers)]
+        threads += [
+            threading.Thread(target=self._worker, args=(started,), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.2)
+        except KeyboardInterrupt:
+            # Süren indirmeler yarim kalir; daemon işçiler süreçle birlikte biter
+            self.stop.set()
+            raise
+        if self.error is not None and self.resolved == 0:
+            raise self.error
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""Staging Module - hızlı geçici dizinde çalış, bitince çıktı dizinine taşı"""
+
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from rich.console import Console
+
+from .tracing import tracer
+
+console = Console()
+
+COPY_BUFFER = 16 * 1024 * 1024
+# Tamamlanmamis indirme parçalari - çıktı dizinine taşınmaz
+PARTIAL_SUFFIXES = (".part", ".ytdl", ".temp", ".segments", ".nora-tmp")
+# Parça/ara dosyalar: name.part-Frag3, birlestirilmemis name.f137.mp4,
+# ffmpeg ara çıktısı name.temp.mp4, fan-out ara çıktısı name.fanout.mp3
+PARTIAL_PATTERN = re.compile(r"\.(part-Frag\d+|f\d+(-\w+)?\.\w+|temp\.\w+|fanout\.\w+)$")
+
+
+def is_partial(name: str) -> bool:
+    """Tamamlanmamis indirme parçasi veya ara dosya mi"""
+    return name.endswith(PARTIAL_SUFFIXES) or PARTIAL_PATTERN.search(name) is not None
+
+
+def preallocate(file, size: int):
+    """Boyutu bilinen dosya için diskte yer ayir"""
+    if size <= 0:
+        return
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(file.fileno(), 0, size)
+            return
+        except OSError:
+            pass
+    file.truncate(size)
+
+
+class ScratchStage:
+    """İş başina scratch dizini (tmpfs/NVMe); biten dosyalari taşı, kalanlari temizle
+
+    finalize_on_exit=False: dosyalari çağiran kendisi yayinlar (yt-dlp
+    -P home:/temp: ile, spotdl boru hatti parça parça); çıkista yalnizca
+    scratch dizini silinir.
+    """
+
+    def __init__(self, output_dir: Path, scratch_root: Optional[Path] = None, finalize_on_exit: bool = True):
+        self.output_dir = Path(output_dir)
+        self.scratch_root = Path(scratch_root) if scratch_root else None
+        self.finalize_on_exit = finalize_on_exit
+        self.path = self.output_dir
+
+    @property
+    def enabled(self) -> bool:
+        return self.scratch_root is not None
+
+    def __enter__(self):
+        if self.enabled:
+            self.scratch_root.mkdir(parents=True, exist_ok=True)
+            self.path = Path(tempfile.mkdtemp(prefix="nora-", dir=self.scratch_root))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.enabled:
+            return False
+        # Hata olsa da (or. playlist'te tek öğe başarisiz) biten dosyalar korunur.
+        # Ctrl+C'de ffmpeg çıktısi son adla yarim kalmis olabilir; hiçbir şey taşınmaz
+        try:
+            if not self.finalize_on_exit or (exc_type is not None and issubclass(exc_type, KeyboardInterrupt)):
+                pass
+            elif exc_type is None:
+                self.finalize()
+            else:
+                try:
+                    self.finalize()
+                except OSError as e:
+                    console.print(f"[red]X[/red] Tamamlanan dosyalar tasinamadi: {e}")
+        finally:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = self.output_dir
+        return False
+
+    def _same_filesystem(self) -> bool:
+        try:
+            return os.stat(self.path).st_dev == os.stat(self.output_dir).st_dev
+        except OSError:
+            return False
+
+    def _copy(self, source: Path, target: Path):
+        """Tek sıralı kopya: önce yer ayir, sonra gecici adla yaz ve rename et"""
+        tmp = target.with_name(target.name + ".nora-tmp")
+        try:
+            with open(source, "rb") as src, open(tmp, "wb") as dst:
+                preallocate(dst, source.stat().st_size)
+                shutil.copyfileobj(src, dst, COPY_BUFFER)
+            os.replace(tmp, target)
+        except BaseException:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+        source.unlink()
+
+    def publish(self, source: Path, same_fs: bool = None) -> Path:
+        """Tek bir bitmis dosyayi çıktı dizinine taşı (var olan dosyanin üzerine yazmaz)"""
+        source = Path(source)
+        if not self.enabled:
+            return source
+        target = self.output_dir / source.relative_to(self.path)
+        if target.exists():
+            console.print(f"[dim]Zaten var, atlandi: {target.name}[/dim]")
+            source.unlink()
+            return target
+        if same_fs is None:
+            same_fs = self._same_filesystem()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if same_fs:
+            os.replace(source, target)
+        else:
+            console.print(f"[dim]Tasiniyor: {target.name}[/dim]")
+            self._copy(source, target)
+        return target
+
+    def finalize(self) -> list:
+        """Tamamlanan dosyalari çıktı dizinine taşı"""
+        files = [
+            f for f in sorted(self.path.rglob("*"))
+            if f.is_file() and not is_partial(f.name)
+        ]
+        if not files:
+            return []
+
+        same_fs = self._same_filesystem()
+        with tracer.span("stage.finalize", "staging", files=len(files), rename=same_fs):
+            return [self.publish(source, same_fs) for source in files]
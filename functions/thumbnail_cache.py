@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""Thumbnail Module - video ID ile önbellek, işlem içi dönüştürme ve gömme"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from rich.console import Console
+
+from .tracing import tracer
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    import mutagen
+except ImportError:
+    mutagen = None
+
+console = Console()
+
+
+def _atomic_write(path: Path, data: bytes):
+    """Eşzamanli yazicilar birbirini bozmasin diye gecici dosya + rename"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+# mutagen ile kapak gomulebilen uzantilar
+EMBED_EXTENSIONS = {"mp3", "m4a", "mp4", "m4v", "flac", "ogg", "opus"}
+
+
+class ThumbnailCache:
+    """Thumbnail'leri bir kez indirip içerik hash'i ile saklayan önbellek"""
+
+    def __init__(self, cache_dir: Path = None, max_size: int = 1280):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".noradownloader" / "thumbnails"
+        self.ids_dir = self.cache_dir / "ids"
+        self.blobs_dir = self.cache_dir / "blobs"
+        self.jpeg_dir = self.cache_dir / "jpeg"
+        for directory in (self.ids_dir, self.blobs_dir, self.jpeg_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.session = requests.Session()
+
+    @staticmethod
+    def available() -> bool:
+        """Pillow ve mutagen yüklü mü"""
+        return Image is not None and mutagen is not None
+
+    @staticmethod
+    def supports(extension: str) -> bool:
+        """Bu uzanti için işlem içi gömme destekleniyor mu"""
+        return extension.lower().lstrip(".") in EMBED_EXTENSIONS
+
+    def fetch(self, video_id: str, url: str) -> str:
+        """Thumbnail'i indir (video ID önbellekteyse atla), içerik hash'ini döndür"""
+        id_file = self.ids_dir / video_id
+        if id_file.exists():
+            digest = id_file.read_text(encoding="utf-8").strip()
+            if (self.blobs_dir / digest).exists():
+                return digest
+
+        response = self.session.get(url, timeout=15)
+        response.raise_for_status()
+        data = response.content
+        digest = hashlib.sha256(data).hexdigest()
+
+        blob = self.blobs_dir / digest
+        if not blob.exists():
+            _atomic_write(blob, data)
+        _atomic_write(id_file, digest.encode("utf-8"))
+        return digest
+
+    def jpeg(self, digest: str) -> bytes:
+        """Ham görseli JPEG'e çevir ve boyutlandir (ayni içerik bir kez işlenir)"""
+        target = self.jpeg_dir / f"{digest}-{self.max_size}.jpg"
+        if target.exists():
+            return target.read_bytes()
+
+        with Image.open(self.blobs_dir / digest) as image:
+            image = image.convert("RGB")
+            image.thumbnail((self.max_size, self.max_size))
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=90, optimize=True)
+        data = buffer.getvalue()
+        _atomic_write(target, data)
+        return data
+
+    def embed(self, file_path: Path, data: bytes):
+        """JPEG kapagi tek bir tag yazimiyla dosyaya göm"""
+        extension = file_path.suffix.lower().lstrip(".")
+
+        if extension == "mp3":
+            from mutagen.id3 import ID3, APIC, ID3NoHeaderError
+            try:
+                tags = ID3(file_path)
+            except ID3NoHeaderError:
+                tags = ID3()
+            tags.delall("APIC")
+            tags.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="Cover", data=data))
+            tags.save(file_path)
+
+        elif extension in ("m4a", "mp4", "m4v"):
+            from mutagen.mp4 import MP4, MP4Cover
+            media = MP4(file_path)
+            media["covr"] = [MP4Cover(data, imageformat=MP4Cover.FORMAT_JPEG)]
+            media.save()
+
+        elif extension in ("flac", "ogg", "opus"):
+            from mutagen.flac import FLAC, Picture
+            picture = Picture()
+            picture.type = 3
+            picture.mime = "image/jpeg"
+            picture.data = data
+            with Image.open(io.BytesIO(data)) as image:
+                picture.width, picture.height = image.size
+            picture.depth = 24
+
+            if extension == "flac":
+                media = FLAC(file_path)
+                media.clear_pictures()
+                media.add_picture(picture)
+            else:
+                media = mutagen.File(file_path)
+                media["metadata_block_picture"] = [base64.b64encode(picture.write()).decode("ascii")]
+            media.save()
+
+        else:
+            raise ValueError(f"Desteklenmeyen format: {extension}")
+
+    def process(self, video_id: str, url: str, file_path: Path) -> bool:
+        """Tek bir öğe için indir, dönüştür ve göm"""
+        with tracer.span("thumbnail", "thumbnail", id=video_id):
+            try:
+                digest = self.fetch(video_id, url)
+                self.embed(Path(file_path), self.jpeg(digest))
+                return True
+            except Exception as e:
+                console.print(f"[dim]Thumbnail eklenemedi ({Path(file_path).name}): {str(e)[:60]}[/dim]")
+                return False
+
+    def process_all(self, items: list, workers: int = 4) -> int:
+        """(video ID, thumbnail URL, dosya) öğelerini paralel işle"""
+        items = [item for item in items if item[1] not in ("", "NA") and self.supports(Path(item[2]).suffix)]
+        if not items:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(lambda item: self.process(*item), items)
+            return sum(results)
+
+
+def read_manifest(manifest: Path) -> list:
+    """yt-dlp'nin yazdigi 'id<TAB>thumbnail<TAB>dosya' satirlarini oku"""
+    try:
+        lines = Path(manifest).read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return []
+    return [tuple(line.split("\t")) for line in lines if line.count("\t") == 2]
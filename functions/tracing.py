@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""Tracing Module - Chrome trace spans ve JSONL metrikleri"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+# İndirme sirasinda medya verisinin yazildigi dosyalar (name.part, name.part-Frag3)
+_PARTIAL_MEDIA = re.compile(r"\.part(-Frag\d+)?$")
+
+
+class _NullSpan:
+    """Tracing kapaliyken kullanilan bos span"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+class _NullStages(_NullSpan):
+    """Tracing kapaliyken yt-dlp'ye ek arguman vermeyen asama izleyici"""
+
+    __slots__ = ()
+
+    def ytdlp_args(self) -> list:
+        return []
+
+
+_NULL_SPAN = _NullSpan()
+_NULL_STAGES = _NullStages()
+
+
+class _Span:
+    """Tek bir zamanlanmis asama"""
+
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name: str, cat: str, args: dict):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.add_span(self.name, self.cat, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        """Span'e ek bilgi ekle"""
+        self.args.update(args)
+
+
+class _Job(_Span):
+    """İndirme işi - span + bayt/süre/TTFB metrikleri
+
+    ttfb_s: iş başindan izlenen dizindeki bir .part/.part-FragN dosyasina
+    ilk medya baytinin yazilmasina kadar geçen süre. Thumbnail gibi yan
+    dosyalar sayilmaz; dizine parça dosyasi yazmayan indiricilerde (spotdl
+    kendi geçici dizinini kullanir) None olur.
+    """
+
+    __slots__ = ("watch_dirs", "before", "first_byte", "_stop", "_thread")
+
+    def __init__(self, tracer, name: str, cat: str, args: dict, watch_dir):
+        super().__init__(tracer, name, cat, args)
+        if isinstance(watch_dir, (list, tuple)):
+            self.watch_dirs = list(dict.fromkeys(Path(d) for d in watch_dir))
+        else:
+            self.watch_dirs = [Path(watch_dir)] if watch_dir else []
+        self.before = {}
+        self.first_byte = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _snapshot(self) -> dict:
+        sizes = {}
+        for watch_dir in self.watch_dirs:
+            try:
+                for entry in os.scandir(watch_dir):
+                    if entry.is_file():
+                        sizes[entry.path] = entry.stat().st_size
+            except OSError:
+                pass
+        return sizes
+
+    def _watch(self):
+        # İlk bayt diske yazilana kadar dizini yokla
+        while not self._stop.wait(0.1):
+            now = self._snapshot()
+            if any(
+                size > self.before.get(name, 0)
+                for name, size in now.items()
+                if _PARTIAL_MEDIA.search(name)
+            ):
+                self.first_byte = time.perf_counter_ns()
+                return
+
+    def __enter__(self):
+        self.before = self._snapshot()
+        super().__enter__()
+        if self.watch_dirs:
+            self._thread = threading.Thread(target=self._watch, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+        after = self._snapshot()
+        transferred = sum(
+            max(size - self.before.get(name, 0), 0)
+            for name, size in after.items()
+            if not name.endswith((".part", ".ytdl"))
+        )
+        duration = (end - self.start) / 1e9
+        record = {
+            "job": self.name,
+            "cat": self.cat,
+            **self.args,
+            "status": "error" if exc_type is not None else "ok",
+            "bytes": transferred,
+            "duration_s": round(duration, 3),
+            "ttfb_s": round((self.first_byte - self.start) / 1e9, 3) if self.first_byte else None,
+            "throughput_Bps": int(transferred / duration) if duration > 0 else None,
+        }
+        self.args["bytes"] = transferred
+        self.tracer.record(record)
+        return super().__exit__(exc_type, exc, tb)
+
+
+class _StageTail:
+    """yt-dlp --print-to-file çıktısını izleyip asama sinirlarini zamanla"""
+
+    # yt-dlp asamalari ve aralarindaki span isimleri
+    STAGES = {
+        "video": "extract",
+        "post_process": "transfer",
+        "after_move": "postprocess",
+    }
+
+    def __init__(self, tracer, cat: str):
+        fd, path = tempfile.mkstemp(prefix="nora-stages-", suffix=".txt")
+        os.close(fd)
+        self.tracer = tracer
+        self.path = Path(path)
+        self.cat = cat
+        self.marks = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ytdlp_args(self) -> list:
+        """Her asamada '<asama>\\t<id>' satiri yazdiran yt-dlp argumanlari"""
+        args = []
+        for when in ("before_dl", *self.STAGES):
+            args += ["--print-to-file", f"{when}:{when}\t%(id)s", str(self.path)]
+        return args
+
+    def _poll(self, offset: int) -> int:
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError:
+            return offset
+        end = data.rfind(b"\n")
+        if end < 0:
+            return offset
+        now = time.perf_counter_ns()
+        for line in data[:end].decode("utf-8", "replace").splitlines():
+            stage, _, item = line.partition("\t")
+            self.marks.append((now, stage, item))
+        return offset + end + 1
+
+    def _run(self):
+        offset = 0
+        while not self._stop.wait(0.05):
+            offset = self._poll(offset)
+        self._poll(offset)
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        # Her öğe için bir önceki sinirdan itibaren span üret. Öğenin ilk
+        # isareti "video"dur; çikarma, herhangi bir öğenin son isaretinden
+        # başlar (playlist'te önceki öğelerin indirmesi dahil edilmez)
+        last = {}
+        previous = self.start
+        for ts, stage, item in self.marks:
+            if stage == "before_dl":
+                last[item] = ts
+            else:
+                name = self.STAGES.get(stage)
+                if name is not None:
+                    begin = previous if stage == "video" else last.get(item, previous)
+                    self.tracer.add_span(f"{self.cat}.{name}", self.cat, begin, ts, {"id": item})
+                    last[item] = ts
+            previous = ts
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+        return False
+
+
+class Tracer:
+    """Hafif tracing katmani - kapaliyken neredeyse sifir maliyet"""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_path = None
+        self.metrics_path = None
+        self._events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+
+    def configure(self, trace_path: Optional[str] = None, metrics_path: Optional[str] = None):
+        """Trace ve metrik dosyalarini ayarla"""
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.metrics_path = Path(metrics_path) if metrics_path else None
+        self.enabled = self.trace_path is not None or self.metrics_path is not None
+
+    def span(self, name: str, cat: str = "app", **args):
+        """Zamanlanmis bir asama olustur"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def job(self, name: str, cat: str, watch_dir=None, **args):
+        """İndirme işi için span + metrik kaydi olustur (watch_dir: dizin veya dizin listesi)"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Job(self, name, cat, args, watch_dir)
+
+    def stages(self, cat: str):
+        """yt-dlp asama sinirlarini izle"""
+        if not self.enabled:
+            return _NULL_STAGES
+        return _StageTail(self, cat)
+
+    def add_span(self, name: str, cat: str, start_ns: int, end_ns: int, args: Optional[dict] = None):
+        """Tamamlanmis bir span ekle"""
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start_ns - self._origin) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+
+    def record(self, metrics: dict):
+        """Bir metrik satirini JSONL dosyasina ekle"""
+        if self.metrics_path is None:
+            return
+        metrics = {"ts": round(time.time(), 3), **metrics}
+        line = json.dumps(metrics, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.metrics_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def export(self):
+        """Chrome/Perfetto trace dosyasini yaz"""
+        if self.trace_path is None:
+            return
+        with self._lock:
+            events = list(self._events)
+        metadata = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "args": {"name": "NoraDownloader"},
+        }
+        with open(self.trace_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": [metadata] + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False, default=str)
+
+
+tracer = Tracer()
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""Transcoder Module - tek kaynak, tek ffmpeg çağrisi, birden fazla çıktı"""
+
+import json
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from rich.console import Console
+
+from .tracing import tracer
+
+console = Console()
+
+# format: (ffmpeg kodlayici, stream copy yapilabilen kaynak codec, kapak destegi)
+AUDIO_FORMATS = {
+    "mp3": ("libmp3lame", "mp3", True),
+    "m4a": ("aac", "aac", True),
+    "flac": ("flac", "flac", True),
+    "opus": ("libopus", "opus", False),
+    "ogg": ("libvorbis", "vorbis", False),
+    "wav": ("pcm_s16le", "pcm_s16le", False),
+}
+# Ogg kapsayicisinda etiketler (Vorbis yorumlari) global değil ses akisi metadata'sidir
+OGG_CONTAINERS = ("opus", "ogg", "oga")
+
+
+def parse_formats(spec: str) -> list:
+    """'mp3:320k,flac,m4a' -> [("mp3", "320k"), ("flac", None), ("m4a", None)]"""
+    formats = []
+    for item in spec.split(","):
+        item = item.strip().lower()
+        if not item:
+            continue
+        name, _, bitrate = item.partition(":")
+        if name not in AUDIO_FORMATS:
+            raise ValueError(f"Desteklenmeyen format: {name} ({', '.join(AUDIO_FORMATS)})")
+        existing = dict(formats)
+        if name in existing:
+            if existing[name] != (bitrate or None):
+                raise ValueError(f"{name} iki farkli bitrate ile istendi")
+            continue
+        formats.append((name, bitrate or None))
+    if not formats:
+        raise ValueError("En az bir format gerekli")
+    return formats
+
+
+def probe_source(path: Path) -> tuple:
+    """Kaynağin ilk ses codec'i ve (varsa) kapak görselinin video akis indeksi"""
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v", "quiet",
+            "-print_format", "json",
+            "-show_entries", "stream=codec_type,codec_name:stream_disposition=attached_pic",
+            str(path)
+        ],
+        capture_output=True,
+        text=True,
+        timeout=10
+    )
+    if result.returncode != 0:
+        return "", None
+    codec, cover = "", None
+    video_index = 0
+    for stream in json.loads(result.stdout).get("streams", []):
+        if stream.get("codec_type") == "audio" and not codec:
+            codec = stream.get("codec_name", "")
+        elif stream.get("codec_type") == "video":
+            if cover is None and stream.get("disposition", {}).get("attached_pic"):
+                cover = video_index
+            video_index += 1
+    return codec, cover
+
+
+def fan_out(source: Path, formats: list, keep_source: bool = False, cover: Path = None) -> list:
+    """Kaynağı bir kez çöz, tüm formatlari tek ffmpeg çağrisiyla üret
+
+    Kaynakta kapak yoksa `cover` (jpg) destekleyen çıktılara eklenir.
+    Var olan hedeflerin üzerine yazilmaz; çıktılar önce ara adla yazilir.
+    """
+    source = Path(source)
+    source_format = source.suffix.lower().lstrip(".")
+    codec, cover_index = probe_source(source)
+    metadata = "0:s:a:0" if source_format in OGG_CONTAINERS else "0"
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y", "-i", str(source)]
+    cover_map = None
+    if cover_index is not None:
+        cover_map = f"0:v:{cover_index}"
+    elif cover is not None and Path(cover).exists():
+        cmd += ["-i", str(cover)]
+        cover_map = "1:v:0"
+    outputs = []
+    renames = []
+    encoded = 0
+    for name, bitrate in formats:
+        encoder, copy_codec, supports_cover = AUDIO_FORMATS[name]
+        target = source.with_suffix(f".{name}")
+
+        # Ayni format ve bitrate istenmemisse kaynak dosyanin kendisi yeterli
+        if name == source_format and bitrate is None:
+            keep_source = True
+            outputs.append(source)
+            continue
+        if target != source and target.exists():
+            console.print(f"[dim]Zaten var, atlandi: {target.name}[/dim]")
+            continue
+        # Kesilen ffmpeg yarim dosyayi son adla birakmasin
+        temp = source.with_name(f"{source.stem}.fanout.{name}")
+        renames.append((temp, target))
+        target = temp
+
+        cmd += ["-map", "0:a:0"]
+        if supports_cover and cover_map is not None:
+            cmd += ["-map", cover_map, "-c:v", "copy", "-disposition:v", "attached_pic"]
+        if codec == copy_codec and bitrate is None:
+            cmd += ["-c:a", "copy"]
+        else:
+            cmd += ["-c:a", encoder]
+            if bitrate:
+                cmd += ["-b:a", bitrate]
+        cmd += ["-map_metadata", metadata, str(target)]
+        encoded += 1
+        outputs.append(source.with_suffix(f".{name}"))
+
+    if encoded:
+        try:
+            with tracer.span("ffmpeg.fanout", "ffmpeg", source=source.name, outputs=len(formats)):
+                subprocess.run(cmd, check=True)
+        except BaseException:
+            for temp, _ in renames:
+                if temp.exists():
+                    temp.unlink()
+            raise
+    for temp, target in renames:
+        temp.replace(target)
+    if not keep_source and source not in outputs:
+        source.unlink()
+    return outputs
+
+
+def fan_out_all(sources: list, formats: list, workers: int = 4, covers: list = None) -> list:
+    """Birden fazla kaynaği paralel işle; her kaynak için üretilen dosyalar"""
+
+    def run(source, cover):
+        try:
+            return fan_out(source, formats, cover=cover)
+        except (subprocess.CalledProcessError, OSError) as e:
+            console.print(f"[red]X[/red] Donusturulemedi: {Path(source).name} ({e})")
+            return []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, sources, covers or [None] * len(sources)))
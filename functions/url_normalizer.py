@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""URL Normalizer - YouTube/Spotify linklerini (platform, tür, ID) olarak ayrıştır"""
+
+import re
+from urllib.parse import parse_qs, urlsplit
+
+YOUTUBE_HOSTS = {
+    "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+    "youtube-nocookie.com", "www.youtube-nocookie.com",
+}
+SHORT_YOUTUBE_HOSTS = {"youtu.be", "www.youtu.be"}
+SPOTIFY_HOSTS = {"open.spotify.com", "play.spotify.com"}
+SPOTIFY_KINDS = {"track", "album", "playlist", "artist", "episode", "show"}
+
+VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+LIST_ID = re.compile(r"^[A-Za-z0-9_-]{2,}$")
+SPOTIFY_ID = re.compile(r"^[A-Za-z0-9]{22}$")
+
+# Kanalin canlı yayin sekmesi (youtube.com/@kanal/live) tek öğedir
+CHANNEL_LIVE_TAB = "live"
+
+# Tek öğe yerine liste olarak indirilen türler
+COLLECTION_KINDS = {"playlist", "channel", "album", "artist", "show"}
+
+
+class MediaRef:
+    """Ayrıştırılmış bağlantı - ayni içerik için ayni anahtar"""
+
+    __slots__ = ("platform", "kind", "id", "original")
+
+    def __init__(self, platform: str, kind: str, id: str, original: str):
+        self.platform = platform
+        self.kind = kind
+        self.id = id
+        self.original = original
+
+    @property
+    def key(self) -> tuple:
+        """Tekrar birlestirme anahtari (tanınmayan linkler için ham URL)"""
+        if not self.id:
+            return ("url", self.original.strip())
+        # youtube.com/live/X ile watch?v=X ayni videodur
+        kind = "video" if self.kind == "live" else self.kind
+        return (self.platform, kind, self.id)
+
+    @property
+    def is_collection(self) -> bool:
+        return self.kind in COLLECTION_KINDS
+
+    @property
+    def url(self) -> str:
+        """Kanonik URL"""
+        if self.platform == "youtube" and self.id:
+            if self.kind == "video":
+                return f"https://www.youtube.com/watch?v={self.id}"
+            if self.kind == "live" and VIDEO_ID.match(self.id):
+                return f"https://www.youtube.com/live/{self.id}"
+            if self.kind == "playlist":
+                return f"https://www.youtube.com/playlist?list={self.id}"
+            if self.kind in ("channel", "live"):
+                return f"https://www.youtube.com/{self.id}"
+        if self.platform == "spotify" and self.id:
+            return f"https://open.spotify.com/{self.kind}/{self.id}"
+        return self.original.strip()
+
+    def __eq__(self, other):
+        return isinstance(other, MediaRef) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"MediaRef({self.platform!r}, {self.kind!r}, {self.id!r})"
+
+
+def _youtube(parts, original: str) -> MediaRef:
+    host = parts.netloc.lower().split(":")[0]
+    segments = [s for s in parts.path.split("/") if s]
+    query = parse_qs(parts.query)
+
+    def ref(kind, id):
+        return MediaRef("youtube", kind, id, original)
+
+    if host in SHORT_YOUTUBE_HOSTS:
+        if segments and VIDEO_ID.match(segments[0]):
+            return ref("video", segments[0])
+        return ref("", "")
+
+    head = segments[0] if segments else ""
+    if head == "watch":
+        video = query.get("v", [""])[0]
+        if VIDEO_ID.match(video):
+            # watch?v=X&list=Y tek video olarak indirilir (--no-playlist davranisi)
+            return ref("video", video)
+    elif head in ("shorts", "embed", "v", "e") and len(segments) > 1:
+        if VIDEO_ID.match(segments[1]):
+            return ref("video", segments[1])
+    elif head == "live" and len(segments) > 1:
+        if VIDEO_ID.match(segments[1]):
+            return ref("live", segments[1])
+    elif head == "playlist":
+        playlist = query.get("list", [""])[0]
+        if LIST_ID.match(playlist):
+            return ref("playlist", playlist)
+    elif head.startswith("@"):
+        return _channel(ref, head.lower(), segments[1:])
+    elif head in ("channel", "c", "user") and len(segments) > 1:
+        channel = segments[1] if head == "channel" else segments[1].lower()
+        return _channel(ref, f"{head}/{channel}", segments[2:])
+    return ref("", "")
+
+
+def _channel(ref, channel: str, rest: list) -> MediaRef:
+    """Kanal kökü veya sekmesi (/videos, /shorts...); /live kanalin canlı yayini"""
+    if not rest:
+        return ref("channel", channel)
+    tab = rest[0].lower()
+    if tab == CHANNEL_LIVE_TAB:
+        return ref("live", f"{channel}/{tab}")
+    return ref("channel", f"{channel}/{tab}")
+
+
+def _spotify(parts, original: str) -> MediaRef:
+    segments = [s for s in parts.path.split("/") if s]
+    # /intl-tr/playlist/ID gibi yerellestirilmis yollari atla
+    if segments and segments[0].startswith("intl-"):
+        segments = segments[1:]
+    if len(segments) >= 2 and segments[0] in SPOTIFY_KINDS and SPOTIFY_ID.match(segments[1]):
+        return MediaRef("spotify", segments[0], segments[1], original)
+    return MediaRef("spotify", "", "", original)
+
+
+def parse_url(url: str) -> MediaRef:
+    """Bağlantıyi (platform, tür, kanonik ID) olarak ayrıştır"""
+    text = url.strip()
+
+    # spotify:track:ID biçimindeki URI'ler
+    if text.lower().startswith("spotify:"):
+        fields = text.split(":")
+        if len(fields) == 3 and fields[1] in SPOTIFY_KINDS and SPOTIFY_ID.match(fields[2]):
+            return MediaRef("spotify", fields[1], fields[2], url)
+        return MediaRef("spotify", "", "", url)
+
+    if "://" not in text:
+        text = "https://" + text
+    parts = urlsplit(text)
+    host = parts.netloc.lower().split(":")[0]
+
+    if host in YOUTUBE_HOSTS or host in SHORT_YOUTUBE_HOSTS:
+        return _youtube(parts, url)
+    if host in SPOTIFY_HOSTS or host.endswith("spotify.link"):
+        return _spotify(parts, url)
+    return MediaRef("unknown", "", "", url)
+
+
+def dedupe(urls: list) -> list:
+    """Ayni içeriğe giden bağlantıları sırayi koruyarak tek işe indir"""
+    seen = set()
+    refs = []
+    for url in urls:
+        ref = parse_url(url)
+        if ref.key not in seen:
+            seen.add(ref.key)
+            refs.append(ref)
+    return refs
@@ -1,69 +1,138 @@
 # -*- coding: utf-8 -*-
 """YouTube Downloader Module - Wrapper for yt-dlp"""
 
+import os
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 from rich.console import Console
-from rich.prompt import Prompt, Confirm
+from rich.prompt import Prompt, Confirm, IntPrompt
 from rich.table import Table
 from rich import box
 
+from .live_capture import LiveCapture, NotLiveError, is_live_url
+from .segmented_downloader import ytdlp_args as segmented_args
+from .staging import ScratchStage
+from .thumbnail_cache import ThumbnailCache, read_manifest
+from .transcoder import fan_out_all
+from .tracing import tracer
+from .url_normalizer import parse_url
+
 console = Console()
 
+# --break-match-filters ile reddedilen öğede yt-dlp'nin çıkis kodu
+LIVE_REJECTED = 101
+
+
+def _seconds(value: str) -> float:
+    """'1:02:03', '2:45', '90' veya '90.5' -> saniye"""
+    parts = value.strip().split(":")
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"Gecersiz zaman: {value}")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    if seconds < 0:
+        raise ValueError(f"Gecersiz zaman: {value}")
+    return seconds
+
+
+def _format_seconds(seconds: float) -> str:
+    """Milisaniye hassasiyetinde, gereksiz sifirlar olmadan (3725.5 -> '3725.5')"""
+    return f"{seconds:.3f}".rstrip("0").rstrip(".")
+
+
+def parse_section(value: str) -> str:
+    """'START-END' bölümünü yt-dlp --download-sections biçimine çevir"""
+    start, sep, end = value.strip().partition("-")
+    if not sep:
+        raise ValueError(f"Bolum START-END biciminde olmali: {value}")
+    start_s = _seconds(start) if start.strip() else 0.0
+    if end.strip().lower() in ("", "inf"):
+        return f"*{_format_seconds(start_s)}-inf"
+    end_s = _seconds(end)
+    if end_s <= start_s:
+        raise ValueError(f"Bolum sonu baslangictan sonra olmali: {value}")
+    return f"*{_format_seconds(start_s)}-{_format_seconds(end_s)}"
+
 
 class YouTubeDownloader:
     """YouTube downloader wrapper"""
     
-    def __init__(self, output_dir: str = "downloads"):
+    def __init__(self, output_dir: str = "downloads", scratch_dir: str = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.scratch_dir = Path(scratch_dir) if scratch_dir else None
     
     def check_ytdlp(self) -> bool:
         """Check if yt-dlp is installed"""
-        try:
-            result = subprocess.run(
-                ["yt-dlp", "--version"],
-                capture_output=True,
-                text=True,
-                check=False
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        with tracer.span("ytdlp.check", "youtube"):
+            try:
+                result = subprocess.run(
+                    ["yt-dlp", "--version"],
+                    capture_output=True,
+                    text=True,
+                    check=False
+                )
+                return result.returncode == 0
+            except FileNotFoundError:
+                return False
     
     def install_ytdlp(self):
         """Install yt-dlp"""
         console.print("\n[yellow]yt-dlp bulunamadi. Yukleniyor...[/yellow]")
-        try:
-            subprocess.run(
-                [sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"],
-                check=True,
-                capture_output=True
-            )
-            console.print("[green]OK[/green] yt-dlp basariyla yuklendi!\n")
-            return True
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]X[/red] yt-dlp yuklenemedi: {e}\n")
-            return False
+        with tracer.span("ytdlp.install", "youtube"):
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"],
+                    check=True,
+                    capture_output=True
+                )
+                console.print("[green]OK[/green] yt-dlp basariyla yuklendi!\n")
+                return True
+            except subprocess.CalledProcessError as e:
+                console.print(f"[red]X[/red] yt-dlp yuklenemedi: {e}\n")
+                return False
     
     def update_ytdlp(self):
         """Update yt-dlp to latest version"""
         console.print("[yellow]yt-dlp guncelleniyor...[/yellow]")
-        try:
-            subprocess.run(
-                [sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"],
-                check=True,
-                capture_output=True
-            )
-            console.print("[green]OK[/green] yt-dlp guncellendi!\n")
-            return True
-        except subprocess.CalledProcessError as e:
-            console.print(f"[red]X[/red] yt-dlp guncellenemedi: {e}\n")
-            return False
+        with tracer.span("ytdlp.update", "youtube"):
+            try:
+                subprocess.run(
+                    [sys.executable, "-m", "pip", "install", "--upgrade", "yt-dlp"],
+                    check=True,
+                    capture_output=True
+                )
+                console.print("[green]OK[/green] yt-dlp guncellendi!\n")
+                return True
+            except subprocess.CalledProcessError as e:
+                console.print(f"[red]X[/red] yt-dlp guncellenemedi: {e}\n")
+                return False
     
     def interactive_mode_with_url(self, url: str):
         """Interactive mode with pre-provided URL"""
+        # Live stream?
+        if is_live_url(url) and Confirm.ask(
+            "[yellow]Canli yayin algilandi. Parcali kayit yapilsin mi?[/yellow]",
+            default=True
+        ):
+            segment_seconds = 0
+            while segment_seconds <= 0:
+                segment_seconds = IntPrompt.ask("[yellow]Parca suresi (sn)[/yellow]", default=300)
+                if segment_seconds <= 0:
+                    console.print("[red]X[/red] Parca suresi sifirdan buyuk olmali")
+            retention = -1
+            while retention < 0:
+                retention = IntPrompt.ask("[yellow]Saklama suresi (sn, 0 = sinirsiz)[/yellow]", default=0)
+                if retention < 0:
+                    console.print("[red]X[/red] Saklama suresi negatif olamaz")
+            from_start = Confirm.ask("[yellow]Yayinin basindan kaydet?[/yellow]", default=False)
+            console.print()
+            if self.record_live(url, segment_seconds, retention or None, from_start):
+                return
+        
         # Audio only?
         audio_only = Confirm.ask(
             "[yellow]Sadece ses olarak indir (MP3)?[/yellow]",
@@ -108,6 +177,22 @@ class YouTubeDownloader:
             quality = "best"
             format_type = "mp3"
         
+        # Section selection
+        sections = []
+        if Confirm.ask(
+            "[yellow]Sadece belirli bolumler indirilsin mi?[/yellow]",
+            default=False
+        ):
+            while not sections:
+                value = Prompt.ask(
+                    "[yellow]Bolumler[/yellow] [dim](or: 1:30-2:45, 10:00-12:00)[/dim]"
+                )
+                try:
+                    sections = [parse_section(part) for part in value.split(",") if part.strip()]
+                except ValueError as e:
+                    console.print(f"[red]X[/red] {e}")
+                    sections = []
+        
         # Custom output directory
         custom_dir = Confirm.ask(
             "[yellow]Ozel cikti dizini kullanmak ister misiniz?[/yellow]",
@@ -123,35 +208,60 @@ class YouTubeDownloader:
             self.output_dir.mkdir(exist_ok=True)
         
         console.print()
-        self.download(url, quality, format_type, audio_only)
+        self.download(url, quality, format_type, audio_only, sections=sections)
     
-    def download(self, url: str, quality: str = "best", format: str = "mp4", audio_only: bool = False):
+    def download(
+        self,
+        url: str,
+        quality: str = "best",
+        format: str = "mp4",
+        audio_only: bool = False,
+        connections: int = 1,
+        formats: list = None,
+        sections: list = None,
+        live_options: dict = None
+    ):
         """Download from YouTube with optimizations and metadata"""
+        ref = parse_url(url)
+        url = ref.url
+        if ref.kind:
+            playlist = ref.is_collection
+        else:
+            playlist = "playlist" in url.lower()
+        
+        # .part, parçalar ve ara akışlar scratch dizininde (varsa) tutulur
+        # yt-dlp -P temp: ile scratch'te çalışir, biten öğeyi kendisi taşır;
+        # çıktı dizinindeki dosyalari gördügü için var olanlari atlar
+        stage = ScratchStage(self.output_dir, self.scratch_dir, finalize_on_exit=False)
         base_cmd = [
             "yt-dlp",
             "--concurrent-fragments", "4",  # 4 paralel parça indirme
             "--no-mtime",  # Daha hızlı
-            "--no-playlist" if "playlist" not in url.lower() else "--yes-playlist",
+            "--yes-playlist" if playlist else "--no-playlist",
             "--extractor-args", "youtube:player_client=android,web",  # SABR sorununu çöz
             "--no-warnings",  # Uyarıları gizle
             "--quiet",  # Sessiz mod
             "--progress",  # Sadece ilerleme göster
             # Metadata ayarları
             "--embed-metadata",  # Metadata'yı dosyaya göm
-            "--embed-thumbnail",  # Thumbnail'i göm
-            "--convert-thumbnails", "jpg",  # Thumbnail'i jpg'ye çevir
             "--add-metadata",  # Ek metadata ekle
             "--parse-metadata", "title:%(title)s",  # Başlık
             "--parse-metadata", "uploader:%(artist)s",  # Sanatçı (uploader)
-            "-o", str(self.output_dir / "%(title)s.%(ext)s"),
+            "-o", "%(title)s.%(ext)s",
         ]
         
-        if audio_only:
+        if formats:
+            # Çoklu format: en iyi ses bir kez indirilir, çıktılar tek ffmpeg ile üretilir
+            cmd = base_cmd + [
+                "-f", "bestaudio/best",
+                "--metadata-from-title", "%(artist)s - %(title)s",
+                url
+            ]
+        elif audio_only:
             cmd = base_cmd + [
                 "-x",  # Extract audio
                 "--audio-format", "mp3",
                 "--audio-quality", "0",  # Best quality
-                "--embed-thumbnail",  # MP3'e thumbnail ekle
                 "--metadata-from-title", "%(artist)s - %(title)s",  # Başlıktan metadata çıkar
                 url
             ]
@@ -162,30 +272,121 @@ class YouTubeDownloader:
                 url
             ]
         
+        # Thumbnail: video ID önbelleği + işlem içi dönüştürme/gömme
+        # (Pillow/mutagen yoksa veya format desteklenmiyorsa yt-dlp + ffmpeg;
+        # çoklu formatta yt-dlp jpg'yi yazar, fan-out ffmpeg çağrisi gömer)
+        thumbnails = None
+        manifest = None
+        write_covers = False
+        extensions = [name for name, _ in formats] if formats else ["mp3" if audio_only else format]
+        if ThumbnailCache.available() and any(ThumbnailCache.supports(ext) for ext in extensions):
+            thumbnails = ThumbnailCache()
+        elif formats:
+            write_covers = True
+            cmd[1:1] = ["--write-thumbnail", "--convert-thumbnails", "jpg"]
+        else:
+            cmd[1:1] = ["--embed-thumbnail", "--convert-thumbnails", "jpg"]
+        if thumbnails is not None or formats:
+            fd, manifest = tempfile.mkstemp(prefix="nora-items-", suffix=".txt")
+            os.close(fd)
+            cmd[1:1] = ["--print-to-file", "after_move:%(id)s\t%(thumbnail)s\t%(filepath)s", manifest]
+        
+        # Bölümler: yalnizca gereken aralik indirilir, anahtar kareden stream copy ile kesilir
+        if sections:
+            for section in sections:
+                cmd[1:1] = ["--download-sections", section]
+            cmd[cmd.index("-o") + 1] = "%(title)s [%(section_start)s-%(section_end)s].%(ext)s"
+        
+        # Canli yayinlar tek büyüyen dosya yerine dönen parçalara kaydedilir.
+        # Karar adrese göre değil yt-dlp'nin is_live alanina göre verilir:
+        # yayin canliysa yt-dlp indirmeden LIVE_REJECTED koduyla çıkar
+        detect_live = not playlist and not sections
+        if detect_live:
+            cmd[1:1] = ["--break-match-filters", "!is_live"]
+        
+        # HTTP indirmeleri için segmentli çok bağlantılı indirici
+        if connections > 1:
+            cmd[1:1] = segmented_args(connections)
+        
+        # Tracing açıksa asama sinirlarini (cikarma/indirme/isleme) izle
+        stages = tracer.stages("youtube")
+        cmd[1:1] = stages.ytdlp_args()
+        
         console.print(f"[bold green]→[/bold green] Hizli indirme baslatiliyor (4 paralel + metadata)...\n")
         
         try:
-            subprocess.run(cmd, check=True)
-            console.print(f"\n[bold green]OK Indirme tamamlandi![/bold green]")
+            with stage:
+                if stage.enabled:
+                    cmd[1:1] = ["-P", f"home:{self.output_dir}", "-P", f"temp:{stage.path}"]
+                else:
+                    cmd[1:1] = ["-P", str(self.output_dir)]
+                with tracer.job("youtube.download", "youtube", [stage.path, self.output_dir], url=url, audio_only=audio_only) as job, stages:
+                    # yt-dlp bir öğe başarisiz olunca da devam eder ve 1 ile çıkar;
+                    # biten öğeler yine de işlenip taşınir
+                    returncode = subprocess.run(cmd).returncode
+                    job.set(returncode=returncode)
+                items = read_manifest(Path(manifest)) if manifest else []
+                if formats:
+                    sources = [Path(source) for _, _, source in items]
+                    covers = [source.with_suffix(".jpg") for source in sources] if write_covers else None
+                    results = fan_out_all(sources, formats, covers=covers)
+                    for cover in covers or []:
+                        if cover.exists():
+                            cover.unlink()
+                    items = [
+                        (video_id, thumbnail, str(output))
+                        for (video_id, thumbnail, _), outputs in zip(items, results)
+                        for output in outputs
+                    ]
+                if thumbnails is not None:
+                    thumbnails.process_all(items)
+            if detect_live and returncode == LIVE_REJECTED:
+                console.print("[cyan]Canli yayin algilandi, parcali kayda geciliyor...[/cyan]\n")
+                if not self.record_live(url, **(live_options or {})):
+                    console.print(f"[bold red]X Canli yayin kaydedilemedi![/bold red]")
+                return
+            if returncode == 0:
+                console.print(f"\n[bold green]OK Indirme tamamlandi![/bold green]")
+            else:
+                console.print(f"\n[bold red]X Indirme sirasinda hata olustu![/bold red]")
+                console.print(f"[dim]Tamamlanan dosyalar kaydedildi. yt-dlp'yi guncelleyin: pip install --upgrade yt-dlp[/dim]")
             console.print(f"[cyan]Konum: {self.output_dir}[/cyan]")
             
             # İndirilen dosyaları göster ve metadata kontrol et
-            self.show_downloaded_files(audio_only)
+            with tracer.span("ffprobe.list", "youtube"):
+                self.show_downloaded_files(audio_only, extensions if formats else None)
             
-        except subprocess.CalledProcessError as e:
-            console.print(f"\n[bold red]X Indirme sirasinda hata olustu![/bold red]")
-            console.print(f"[dim]yt-dlp'yi guncelleyin: pip install --upgrade yt-dlp[/dim]")
         except KeyboardInterrupt:
             console.print("\n[yellow]Indirme iptal edildi.[/yellow]")
+        finally:
+            if manifest is not None and os.path.exists(manifest):
+                os.unlink(manifest)
+    
+    def record_live(self, url: str, segment_seconds: int = 300, retention_seconds: int = None, from_start: bool = False):
+        """Canli yayini dönen parçalara kaydet; yayin canli değilse False"""
+        capture = LiveCapture(self.output_dir, segment_seconds, retention_seconds, from_start, self.scratch_dir)
+        try:
+            capture.record(url)
+        except NotLiveError as e:
+            if capture.published:
+                console.print(f"[cyan]Yayin sona erdi ({e}).[/cyan]")
+                return True
+            console.print(f"[yellow]Canli HLS yayini degil ({e})[/yellow]\n")
+            return False
+        except subprocess.CalledProcessError:
+            console.print(f"\n[bold red]X Canli yayin adresi alinamadi![/bold red]")
+            console.print(f"[dim]yt-dlp'yi guncelleyin: pip install --upgrade yt-dlp[/dim]")
+        return True
     
-    def show_downloaded_files(self, audio_only: bool = False):
+    def show_downloaded_files(self, audio_only: bool = False, extensions: list = None):
         """İndirilen dosyaları ve metadata'larını göster"""
         import json
         from rich.table import Table
         from rich import box
         
         # Son indirilen dosyaları bul
-        extensions = ['mp3'] if audio_only else ['mp4', 'mkv', 'webm']
+        if extensions is None:
+            extensions = ['mp3'] if audio_only else ['mp4', 'mkv', 'webm']
         files = []
         for ext in extensions:
             files.extend(list(self.output_dir.glob(f"*.{ext}")))
@@ -216,12 +417,13 @@ class YouTubeDownloader:
                     str(file_path)
                 ]
                 
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                with tracer.span("ffprobe", "youtube", file=file_path.name):
+                    result = subprocess.run(
+                        cmd,
+                        capture_output=True,
+                        text=True,
+                        timeout=5
+                    )
                 
                 if result.returncode == 0:
                     data = json.loads(result.stdout)
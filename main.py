@@ -24,8 +24,11 @@ from rich import box
 from rich.text import Text
 
 from functions.spotify_downloader import SpotifyDownloader
-from functions.youtube_downloader import YouTubeDownloader
+from functions.youtube_downloader import YouTubeDownloader, parse_section
 from functions.ffmpeg_installer import FFmpegInstaller
+from functions.tracing import tracer
+from functions.transcoder import parse_formats
+from functions.url_normalizer import dedupe, parse_url
 
 console = Console()
 
@@ -49,14 +52,42 @@ def show_main_banner():
     console.print()
 
 
-def detect_platform(url: str) -> str:
-    """URL'den platformu otomatik algıla"""
-    if "spotify.com" in url:
-        return "spotify"
-    elif "youtube.com" in url or "youtu.be" in url:
-        return "youtube"
-    else:
-        return "unknown"
+def formats_arg(value: str) -> list:
+    """--formats degerini dogrula"""
+    try:
+        return parse_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def section_arg(value: str) -> str:
+    """--section degerini dogrula"""
+    try:
+        return parse_section(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def positive_int(value: str) -> int:
+    """Pozitif tamsayi (saniye) dogrula"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Tamsayi olmali: {value}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"Sifirdan buyuk olmali: {value}")
+    return number
+
+
+def read_batch(path: str) -> list:
+    """--batch dosyasindan URL listesi (satir basina bir URL, # yorum)"""
+    urls = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                urls.append(line)
+    return urls
 
 
 def interactive_mode():
@@ -136,7 +167,9 @@ def interactive_mode():
     console.print()
     
     # Platform algıla
-    platform = detect_platform(url)
+    ref = parse_url(url)
+    platform = ref.platform
+    url = ref.url
     
     if platform == "spotify":
         console.print("[green]✓[/green] Spotify linki algilandi!\n")
@@ -180,11 +213,6 @@ def interactive_mode():
 
 def main():
     """Ana program"""
-    # FFmpeg kontrolü (sessiz)
-    ffmpeg_installer = FFmpegInstaller()
-    if not ffmpeg_installer.check_ffmpeg():
-        console.print("[dim]FFmpeg bulunamadi. Otomatik kurulum icin -i modunu kullanin.[/dim]\n")
-    
     parser = argparse.ArgumentParser(
         description="Universal Media Downloader - Spotify & YouTube",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -193,19 +221,37 @@ Ornekler:
   %(prog)s -u https://open.spotify.com/playlist/...
   %(prog)s -u https://www.youtube.com/watch?v=...
   %(prog)s -u https://www.youtube.com/playlist?list=... --audio
+  %(prog)s -u https://youtu.be/... -u https://open.spotify.com/track/...
+  %(prog)s --batch links.txt --audio
+  %(prog)s -u https://www.youtube.com/watch?v=... -c 8
+  %(prog)s -u https://www.youtube.com/watch?v=... --section 1:30-2:45 --section 10:00-12:00
+  %(prog)s -u https://open.spotify.com/album/... --formats mp3:320k,flac
+  %(prog)s -u https://www.youtube.com/live/... --segment-time 600 --retention 7200
   %(prog)s -i  # Interaktif mod
+  %(prog)s -u https://www.youtube.com/watch?v=... --trace trace.json
         """
     )
     
     parser.add_argument(
         "-u", "--url",
-        help="Spotify veya YouTube URL"
+        action="append",
+        help="Spotify veya YouTube URL (tekrarlanabilir)"
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Satir basina bir URL iceren dosya (# ile baslayan satirlar atlanir)"
     )
     parser.add_argument(
         "-o", "--output",
         default="downloads",
         help="Cikti dizini (varsayilan: downloads)"
     )
+    parser.add_argument(
+        "--scratch-dir",
+        metavar="DIR",
+        help="Gecici dosyalar icin hizli dizin (tmpfs/NVMe); bitince cikti dizinine tasinir"
+    )
     parser.add_argument(
         "-p", "--platform",
         choices=["spotify", "youtube", "auto"],
@@ -217,50 +263,161 @@ Ornekler:
         action="store_true",
         help="Sadece ses olarak indir (YouTube icin)"
     )
+    parser.add_argument(
+        "--formats",
+        type=formats_arg,
+        metavar="LIST",
+        help="Tek indirmeden birden fazla ses formati (or: mp3:320k,flac,m4a)"
+    )
+    parser.add_argument(
+        "--section",
+        type=section_arg,
+        action="append",
+        metavar="START-END",
+        help="YouTube icin sadece bu zaman araligini indir (tekrarlanabilir, or: 1:30-2:45)"
+    )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Canli yayini donen parcalara kaydet (canli yayinlar otomatik algilanir)"
+    )
+    parser.add_argument(
+        "--segment-time",
+        type=positive_int,
+        default=300,
+        metavar="SN",
+        help="Canli kayit parca suresi (varsayilan: 300)"
+    )
+    parser.add_argument(
+        "--retention",
+        type=positive_int,
+        metavar="SN",
+        help="Canli kayitta sadece son SN saniyelik parcalari sakla"
+    )
+    parser.add_argument(
+        "--live-from-start",
+        action="store_true",
+        help="Canli yayini canli noktadan degil basindan kaydet"
+    )
+    parser.add_argument(
+        "-c", "--connections",
+        metavar="N",
+        type=int,
+        default=1,
+        help="YouTube icin segmentli indirici baglanti sayisi (varsayilan: 1, yt-dlp yerel)"
+    )
     parser.add_argument(
         "-i", "--interactive",
         action="store_true",
         help="Interaktif mod"
     )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Asama surelerini Chrome/Perfetto trace dosyasina yaz"
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Is basina bayt/sure/TTFB metriklerini JSONL dosyasina yaz "
+             "(varsayilan: --trace ile birlikte FILE.metrics.jsonl)"
+    )
     
     args = parser.parse_args()
     
+    metrics = args.metrics
+    if args.trace and not metrics:
+        metrics = os.path.splitext(args.trace)[0] + ".metrics.jsonl"
+    tracer.configure(args.trace, metrics)
+    
+    try:
+        run(args)
+    finally:
+        tracer.export()
+
+
+def run(args):
+    """Komut satiri argumanlarina gore programi calistir"""
+    # FFmpeg kontrolü (sessiz)
+    ffmpeg_installer = FFmpegInstaller()
+    if not ffmpeg_installer.check_ffmpeg():
+        console.print("[dim]FFmpeg bulunamadi. Otomatik kurulum icin -i modunu kullanin.[/dim]\n")
+    
+    urls = list(args.url or [])
+    if args.batch:
+        try:
+            urls += read_batch(args.batch)
+        except OSError as e:
+            console.print(f"[red]X[/red] Batch dosyasi okunamadi: {e}")
+            sys.exit(1)
+    
     # İnteraktif mod
-    if args.interactive or not args.url:
+    if args.interactive or not urls:
         interactive_mode()
         return
     
     # Komut satırı modu
     show_main_banner()
     
-    # Platform algılama
-    if args.platform == "auto":
-        platform = detect_platform(args.url)
-    else:
-        platform = args.platform
+    # Ayni içeriğe giden linkleri tek işe indir
+    refs = dedupe(urls)
+    if len(refs) < len(urls):
+        console.print(f"[dim]{len(urls) - len(refs)} yinelenen baglanti birlestirildi[/dim]\n")
     
-    if platform == "spotify":
-        console.print("[green]✓[/green] Spotify modu\n")
-        downloader = SpotifyDownloader(args.output)
+    downloaders = {}
+    failed = False
+    for ref in refs:
+        # Platform algılama
+        platform = ref.platform if args.platform == "auto" else args.platform
         
-        if not downloader.check_spotdl():
-            console.print("[red]spotdl yuklu degil! Lutfen yukleyin: pip install spotdl[/red]")
-            sys.exit(1)
-        
-        downloader.download(args.url)
-        
-    elif platform == "youtube":
-        console.print("[green]✓[/green] YouTube modu\n")
-        downloader = YouTubeDownloader(args.output)
-        
-        if not downloader.check_ytdlp():
-            console.print("[red]yt-dlp yuklu degil! Lutfen yukleyin: pip install yt-dlp[/red]")
-            sys.exit(1)
-        
-        downloader.download(args.url, audio_only=args.audio)
-        
-    else:
-        console.print("[red]X[/red] Gecersiz URL veya platform!")
+        if platform == "spotify":
+            downloader = downloaders.get("spotify")
+            if downloader is None:
+                console.print("[green]✓[/green] Spotify modu\n")
+                downloader = SpotifyDownloader(args.output, args.scratch_dir)
+                
+                if not downloader.check_spotdl():
+                    console.print("[red]spotdl yuklu degil! Lutfen yukleyin: pip install spotdl[/red]")
+                    sys.exit(1)
+                downloaders["spotify"] = downloader
+            
+            downloader.download(ref.url, formats=args.formats)
+            
+        elif platform == "youtube":
+            downloader = downloaders.get("youtube")
+            if downloader is None:
+                console.print("[green]✓[/green] YouTube modu\n")
+                downloader = YouTubeDownloader(args.output, args.scratch_dir)
+                
+                if not downloader.check_ytdlp():
+                    console.print("[red]yt-dlp yuklu degil! Lutfen yukleyin: pip install yt-dlp[/red]")
+                    sys.exit(1)
+                downloaders["youtube"] = downloader
+            
+            # Yayinin canli olup olmadigina yt-dlp karar verir; bölüm istenmisse normal indirilir
+            live_options = {
+                "segment_seconds": args.segment_time,
+                "retention_seconds": args.retention,
+                "from_start": args.live_from_start,
+            }
+            if (args.live or args.retention or args.live_from_start) and not args.section:
+                if downloader.record_live(ref.url, **live_options):
+                    continue
+            
+            downloader.download(
+                ref.url,
+                audio_only=args.audio,
+                connections=args.connections,
+                formats=args.formats,
+                sections=args.section,
+                live_options=live_options
+            )
+            
+        else:
+            console.print(f"[red]X[/red] Gecersiz URL veya platform: {ref.original}")
+            failed = True
+    
+    if failed:
         sys.exit(1)
 
 